@@ -1,4 +1,4 @@
-from siteforms.composers.base import FormComposer
+from siteforms.composers.base import FormComposer, make_composer
 from siteforms.composers.bootstrap4 import Bootstrap4, FORM, ALL_FIELDS
 from siteforms.composers.bootstrap5 import Bootstrap5
 from siteforms.toolbox import ModelForm, Form, fields, FilteringModelForm
@@ -107,7 +107,8 @@ def index(request, theme='none'):
     option_values = handle_opts(request, composer_options)
 
     SubForm1 = type('SubForm', (SubFormBase,), dict(
-        Composer=type('Composer', composer, {
+        Composer=make_composer(composer, {
+            'opt_size': 'sm',
             'opt_render_labels': False,
             'opt_placeholder_label': True,
             'layout': {
@@ -117,7 +118,7 @@ def index(request, theme='none'):
     ))
 
     Form = type('ArticleForm', (ModelForm,), dict(
-        Composer=type('Composer', composer, composer_options),
+        Composer=make_composer(composer, composer_options),
         Meta=ArticleFormMeta,
         subforms={'formsub1': SubForm1},
         readonly_fields={'email'},
@@ -133,8 +134,8 @@ def index(request, theme='none'):
 
     class FilterForm(FilteringModelForm):
 
-        Composer = type(
-            'Composer', composer,
+        Composer = make_composer(
+            composer,
             {**composer_options, 'opt_form_inline': True, 'opt_render_labels': True}
         )
 
@@ -1,8 +1,12 @@
+import asyncio
 import json
+from contextlib import contextmanager
+from copy import deepcopy
 from types import MethodType
-from typing import Type, Set, Dict, Union, Generator, Callable, Any, Tuple
+from typing import Type, Set, Dict, Union, Generator, Callable, Any, Tuple, ContextManager, Iterable, Optional
 from django.utils.datastructures import MultiValueDict
-from django.db.models import QuerySet
+from django.core.exceptions import EmptyResultSet
+from django.db.models import QuerySet, Model
 from django.forms import (
     BaseForm,
     modelformset_factory, HiddenInput,
@@ -12,9 +16,13 @@ from django.http import HttpRequest, QueryDict
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
-from .fields import SubformField, EnhancedBoundField, EnhancedField
-from .formsets import ModelFormSet, SiteformFormSetMixin
-from .utils import bind_subform, UNSET, temporary_fields_patch
+from .cache import render_cached, arender_cached, connect_invalidation
+from .composers.base import make_composer
+from .fields import SubformField, EnhancedField
+from .formsets import ModelFormSet, SiteformFormSetMixin, WINDOW_PAGE
+from .utils import (
+    bind_subform, UNSET, aprefetch_related, afetch_choices, ChoicesLeadingMixin, render_async, check_async_support,
+)
 from .widgets import ReadOnlyWidget
 
 if False:  # pragma: nocover
@@ -24,6 +32,7 @@ if False:  # pragma: nocover
 TypeSubform = Union['SiteformsMixin', SiteformFormSetMixin]
 TypeDefFieldsAll = Union[Set[str], str]
 TypeDefSubforms = Dict[str, Type['SiteformsMixin']]
+TypeFieldsPlan = Tuple[Tuple[str, Optional[Type[ReadOnlyWidget]], bool, bool], ...]
 
 MACRO_ALL = '__all__'
 
@@ -70,8 +79,13 @@ class SiteformsMixin(BaseForm):
         {
             'subformfield1': {'extra': 2},
             'subformfield1': {'validate_max': True, 'min_num': 2},
+            'subformfield2': {'window_size': 50},
         }
 
+    `window_size` is a special key for M2M subforms. If set, only a window (page)
+    of related items of this size is rendered and validated. Window page number
+    is taken from `<prefix>-PAGE` parameter of submitted data or GET (e.g.: ?subformfield2-PAGE=2).
+
     .. note:: This can also be passed into __init__() as the keyword-argument
         with the same name.
     
@@ -80,8 +94,52 @@ class SiteformsMixin(BaseForm):
     is_submitted: bool = False
     """Whether this form is submitted and uses th submitted data."""
 
+    render_cache_readonly: Union[bool, int] = False
+    """Allows caching of rendered read-only forms (see `readonly_fields='__all__'`)
+    bound to model instances. Use True for the default cache timeout or an integer
+    for a timeout in seconds.
+
+    Cache key includes form and composer classes, current language, instance pk
+    and instance version (see `render_cache_version`).
+
+    .. note:: Forms with CSRF tokens (POST forms rendered with form tags) are not cached.
+
+    """
+
+    render_cache_version: Union[str, Callable[[Any], Any]] = None
+    """Instance attribute name (e.g. 'updated') or a callable accepting an instance
+    to get a version to be a part of a cache key for `render_cache_readonly`.
+
+    """
+
+    render_cache_invalidate: bool = False
+    """Whether to invalidate `render_cache_readonly` cache on `post_save`
+    and `m2m_changed` signals for a model of this form.
+
+    """
+
+    render_cache_unbound: Union[bool, int] = False
+    """Allows caching of rendered unbound forms without saved model instances
+    (e.g. search or signup forms). Use True for the default cache timeout or an integer
+    for a timeout in seconds.
+
+    Cache key includes form and composer classes, current language, id, target url,
+    prefix and initial data. CSRF token is put into cached HTML for every request.
+
+    .. warning:: Do not use for forms which HTML depends on something else
+        (e.g. a request or dynamic choices).
+
+    """
+
+    render_cache_alias: str = 'default'
+    """Django cache alias to use for render caching."""
+
     _cls_subform_field = SubformField
 
+    _formset_classes: Dict[tuple, Type[ModelFormSet]] = {}
+
+    _fields_plans: Dict[tuple, TypeFieldsPlan] = {}
+
     Composer: Type['FormComposer'] = None
 
     def __init__(
@@ -97,6 +155,7 @@ class SiteformsMixin(BaseForm):
             subforms: TypeDefSubforms = UNSET,
             submit_marker: Any = UNSET,
             render_form_tag: bool = UNSET,
+            composer_options: Dict[str, Any] = None,
             **kwargs
     ):
         """
@@ -128,6 +187,9 @@ class SiteformsMixin(BaseForm):
             Useful in conjunction with `readonly_fields='__all__` to make read-only details pages
             using form layout.
 
+        :param composer_options: Composer options (opt_*) to override for this form,
+            e.g. {'opt_render_labels': False}. Allows option tuning without composer subclassing.
+
         :param kwargs: Form arguments to pass to the base
             class of this form and also to subforms.
 
@@ -145,6 +207,10 @@ class SiteformsMixin(BaseForm):
         self.formset_kwargs = (self.formset_kwargs if formset_kwargs is UNSET else formset_kwargs) or {}
         self.subforms = (self.subforms if subforms is UNSET else subforms) or {}
         self.composer_render_form_tag = render_form_tag
+        self.composer_options = composer_options or {}
+        self._composer = None
+        self._fields_state_applied = False
+        self._fields_deferred = None
 
         self.id = id
         self.target_url = target_url
@@ -170,6 +236,12 @@ class SiteformsMixin(BaseForm):
 
         super().__init__(*args, **kwargs)
 
+        # Bound fields are to use fields of this very form instance
+        # (see `_meta_hook()`), so that field state (widgets, disabled)
+        # could be applied without affecting form class base fields.
+        for field in self.fields.values():
+            field.get_bound_field = MethodType(EnhancedField.get_bound_field, field)
+
     def __str__(self):
         return self.render()
 
@@ -193,6 +265,11 @@ class SiteformsMixin(BaseForm):
                     validators=field.validators,
                 )
 
+        if cls.render_cache_invalidate:
+            model = getattr(getattr(cls, '_meta', None), 'model', None)
+            if model is not None:
+                connect_invalidation(model, alias=cls.render_cache_alias)
+
     @classmethod
     def _combine_dicts(cls, *, args: list, kwargs: dict, src: dict, arg_idx: int, kwargs_key: str) -> MultiValueDict:
 
@@ -233,7 +310,7 @@ class SiteformsMixin(BaseForm):
         # Handle user supplied data.
         if src and request:
             data = getattr(request, src)
-            is_submitted = data.get(self.Composer.opt_submit_name, '') == self.submit_marker
+            is_submitted = data.get(self.get_composer_option('opt_submit_name'), '') == self.submit_marker
 
             self.is_submitted = is_submitted
 
@@ -297,7 +374,11 @@ class SiteformsMixin(BaseForm):
 
             # Attach Composer automatically if none in subform.
             if getattr(subform_cls, 'Composer', None) is None:
-                setattr(subform_cls, 'Composer', type('DynamicComposer', self.Composer.__bases__, {}))
+                composer = self.Composer
+                # Sizing is applied on composer class creation, so pass it on.
+                size = getattr(composer, 'opt_size', '')
+                setattr(subform_cls, 'Composer', make_composer(
+                    composer.__bases__, {'opt_size': size} if size else None, name='DynamicComposer'))
 
             kwargs_form = self._subforms_kwargs.copy()
             kwargs_form['render_form_tag'] = False
@@ -339,11 +420,14 @@ class SiteformsMixin(BaseForm):
             if isinstance(original_field, ModelMultipleChoiceField):
                 # Many-to-many.
 
-                formset_cls = modelformset_factory(
-                    original_field.queryset.model,
-                    form=subform_cls,
-                    formset=ModelFormSet,
-                    **self.formset_kwargs.get(name, {}),
+                formset_kwargs = dict(self.formset_kwargs.get(name, {}))
+                window_size = formset_kwargs.pop('window_size', 0)
+
+                formset_cls = self._get_formset_cls(
+                    name=name,
+                    model=original_field.queryset.model,
+                    subform_cls=subform_cls,
+                    formset_kwargs=formset_kwargs,
                 )
 
                 queryset = None
@@ -361,6 +445,8 @@ class SiteformsMixin(BaseForm):
                     prefix=name,
                     form_kwargs=kwargs_form,
                     queryset=queryset,
+                    window_size=window_size,
+                    window_page=self._get_window_page(prefix=name) if window_size else 1,
                 )
 
             elif isinstance(original_field, ModelChoiceField):
@@ -376,6 +462,51 @@ class SiteformsMixin(BaseForm):
 
         return subform
 
+    def _get_formset_cls(
+            self,
+            *,
+            name: str,
+            model: Type[Model],
+            subform_cls: Type['SiteformsMixin'],
+            formset_kwargs: dict,
+    ) -> Type[ModelFormSet]:
+        # Formset classes are cached not to construct them (and their forms classes)
+        # for every form instance. This also allows formsets to reuse cached stencils.
+        key = (self.__class__, name, model, subform_cls, repr(sorted(formset_kwargs.items())))
+
+        formset_classes = self._formset_classes
+        formset_cls = formset_classes.get(key)
+
+        if formset_cls is None:
+
+            if len(formset_classes) >= 512:
+                formset_classes.clear()
+
+            formset_cls = formset_classes[key] = modelformset_factory(
+                model,
+                form=subform_cls,
+                formset=ModelFormSet,
+                **formset_kwargs,
+            )
+
+        return formset_cls
+
+    def _get_window_page(self, *, prefix: str) -> int:
+        # Window page is taken from submitted data, or from GET parameters,
+        # e.g.: ?fm2m-PAGE=2
+        name = f'{prefix}-{WINDOW_PAGE}'
+        data = self.data
+
+        if not data:
+            request = self.request
+            data = request.GET if request else {}
+
+        try:
+            return int(data.get(name, 1))
+
+        except (TypeError, ValueError):
+            return 1
+
     def _spawn_subform_inline(
             self,
             *,
@@ -408,9 +539,49 @@ class SiteformsMixin(BaseForm):
         return subform_cls(**{'prefix': name, **kwargs_form})
 
     def _iter_subforms(self) -> Generator[TypeSubform, None, None]:
+        deferred = self._get_fields_deferred()
+
         for name in self.subforms:
+            if name in deferred:
+                continue
             yield self.get_subform(name=name)
 
+    def _get_fields_deferred(self) -> Set[str]:
+        # Fields of deferred groups not loaded into a submitted form
+        # (see `Composer.groups_deferred`). Their data is not submitted,
+        # so they are neither cleaned nor saved.
+        fields_deferred = self._fields_deferred
+
+        if fields_deferred is None:
+            fields_deferred = set()
+
+            if self.is_submitted and getattr(self.Composer, 'groups_deferred', None):
+                composer = self.get_composer()
+
+                for alias in composer.get_deferred_pending():
+                    fields_deferred.update(composer.get_group_fields(alias))
+
+            self._fields_deferred = fields_deferred
+
+        return fields_deferred
+
+    def full_clean(self):
+        deferred = self._get_fields_deferred()
+
+        if not deferred:
+            return super().full_clean()
+
+        # Fields are excluded for cleaning only, since they are still
+        # required by layout to render placeholders of deferred groups.
+        fields = self.fields
+        self.fields = {name: field for name, field in fields.items() if name not in deferred}
+
+        try:
+            super().full_clean()
+
+        finally:
+            self.fields = fields
+
     def is_valid(self):
 
         valid = True
@@ -427,8 +598,30 @@ class SiteformsMixin(BaseForm):
         """Spawns a form composer object.
         Hook method. May be reimplemented by a subclass
         for a further composer modification.
+
+        Composer object is reused for subsequent renders of this form.
+
         """
-        return self.Composer(self)
+        composer = self._composer
+
+        if composer is None:
+            composer = self._composer = self.Composer(self, options=self.composer_options)
+
+        return composer
+
+    def get_composer_option(self, name: str) -> Any:
+        """Returns composer option value for this form
+        taking into account overrides from `composer_options`.
+
+        :param name: Option name, e.g. opt_render_form_tag
+
+        """
+        options = self.composer_options
+
+        if name in options:
+            return options[name]
+
+        return getattr(self.Composer, name)
 
     def render(self, template_name=None, context=None, renderer=None):
         """Renders this form as a string."""
@@ -440,11 +633,170 @@ class SiteformsMixin(BaseForm):
                 context or self.get_context(),
             ))
 
-        def render_():
-            return mark_safe(self.get_composer().render(
+        return mark_safe(render_cached(self, render=lambda: ''.join(self.iter_render())))
+
+    def iter_render(self) -> Generator[str, None, None]:
+        """Renders this form yielding HTML chunks.
+
+        Can be used with StreamingHttpResponse to stream large forms
+        (e.g. with many formset subforms) to a client.
+
+        """
+        with self._attrs_applied():
+            yield from self.get_composer().render_iter(
                 render_form_tag=self.composer_render_form_tag,
-            ))
-        return self._apply_attrs(callback=render_)
+            )
+
+    async def arender(self) -> str:
+        """Asynchronous version of render() for ASGI deployments.
+
+        Data required for rendering (related objects of read-only fields,
+        choices, formsets querysets) is prefetched using async ORM
+        (see aprefetch()), so that rendering doesn't block an event loop.
+
+        Example::
+
+            async def view(request):
+                form = MyForm(request=request, src='POST', instance=await Thing.objects.aget(id=1))
+                return HttpResponse(await form.arender())
+
+        .. note:: Requires Django 4.1+.
+
+        """
+        check_async_support()
+
+        async def render():
+            return await render_async(prefetch=self.aprefetch, render=lambda: ''.join(self.iter_render()))
+
+        return mark_safe(await arender_cached(self, render=render))
+
+    async def aprefetch(self):
+        """Loads data required to render this form and its subforms
+        using async ORM, so that a subsequent rendering doesn't query database.
+
+        Bound forms are validated in a thread beforehand, since validation may query database.
+
+        .. note:: Requires Django 4.1+.
+
+        """
+        check_async_support()
+        await self._aprefetch(choices={})
+
+    async def _aprefetch(self, *, choices: Dict[tuple, asyncio.Future]):
+        # Choices are shared by the forms of the same class (e.g. in formsets),
+        # so they are fetched once per field and query.
+
+        if self.is_bound and self._errors is None:
+            from asgiref.sync import sync_to_async
+            await sync_to_async(self.full_clean)()
+
+        readonly = self.readonly_fields
+        hidden = self.hidden_fields
+        instance = getattr(self, 'instance', None)
+
+        all_macro = MACRO_ALL
+        tasks = []
+
+        async def prefetch_choices(name: str, field: ModelChoiceField):
+            try:
+                key = (self.__class__, name, f'{field.queryset.query}')
+
+            except EmptyResultSet:
+                field.widget.choices = await afetch_choices(field)
+                return
+
+            fetched = choices.get(key)
+
+            if fetched is None:
+                fetched = choices[key] = asyncio.ensure_future(afetch_choices(field))
+
+            field.widget.choices = await fetched
+
+        self._apply_fields_state()
+
+        for name, field in self.fields.items():
+
+            if isinstance(field, SubformField):
+                if not isinstance(field.original_field, ModelMultipleChoiceField):
+                    # FK subform is spawned for a related object.
+                    tasks.append(aprefetch_related(instance, name))
+                continue
+
+            if not isinstance(field, ModelChoiceField):
+                continue
+
+            if readonly == all_macro or name in readonly or isinstance(field.widget, ReadOnlyWidget):
+                tasks.append(aprefetch_related(instance, name))
+
+            elif name not in hidden and field.queryset is not None:
+                tasks.append(prefetch_choices(name, field))
+
+        await asyncio.gather(*tasks)
+        await asyncio.gather(*(subform._aprefetch(choices=choices) for subform in self._iter_subforms()))
+
+    def render_group(self, alias: str) -> str:
+        """Renders a single layout group (see `Composer.layout`).
+        Only fields of the group are rendered.
+
+        Useful for partial page updates (e.g. with HTMX).
+
+        :param alias: Group alias.
+
+        """
+        composer = self.get_composer()
+
+        with self._attrs_applied():
+            return mark_safe(composer.render_group(alias))
+
+    def render_deferred(self) -> Optional[str]:
+        """Renders a deferred group (see `Composer.groups_deferred`)
+        requested by a client. Returns None if no group is requested.
+
+        Example::
+
+            form = MyForm(request=request)
+            html = form.render_deferred()
+
+            if html is not None:
+                return HttpResponse(html)
+
+        """
+        alias = self.get_composer().get_deferred_alias()
+
+        if alias is None:
+            return None
+
+        return self.render_group(alias)
+
+    def render_field(self, name: str) -> str:
+        """Renders a single field box (including label, hint and feedback).
+
+        Useful for partial page updates (e.g. with HTMX).
+
+        :param name: Field name.
+
+        """
+        with self._attrs_applied():
+            return mark_safe(self.get_composer().render_field(name))
+
+    def render_errors(self, previous: Iterable[str] = None) -> Dict[str, str]:
+        """Renders only the parts of a bound form affected by validation:
+        boxes of fields having errors, boxes of fields which had errors previously
+        and non-field feedback. Results are keyed by IDs of wrapping elements
+        (see `Composer.opt_box_ids`), e.g. to be used for out-of-band swaps.
+
+        :param previous: Names of fields having errors on a previous render.
+            Boxes for these fields are rendered even if errors are gone.
+
+        """
+        names = {*self.errors, *(previous or ())}
+
+        with self._attrs_applied():
+            return {
+                box_id: mark_safe(html)
+                for box_id, html in self.get_composer().render_errors(
+                    [name for name in self.fields if name in names]).items()
+            }
 
     def is_multipart(self):
 
@@ -483,51 +835,91 @@ class SiteformsMixin(BaseForm):
 
     def _apply_attrs(self, callback: Callable):
 
+        with self._attrs_applied():
+            return callback()
+
+    @contextmanager
+    def _attrs_applied(self) -> ContextManager:
+        self._apply_fields_state()
+        yield
+
+    def _get_fields_plan(self) -> TypeFieldsPlan:
+        # Fields state plan depends only on form class, fields and state sets,
+        # so it is computed once and reused by forms with the same settings
+        # (e.g. those using class attributes or formset forms).
         disabled = self.disabled_fields
         hidden = self.hidden_fields
         readonly = self.readonly_fields
-        get_readonly_cls = self._get_widget_readonly_cls
+        fields = self.fields
 
-        all_macro = MACRO_ALL
+        def freeze(value: TypeDefFieldsAll):
+            return value if isinstance(value, str) else frozenset(value)
+
+        key = (self.__class__, tuple(fields), freeze(disabled), freeze(hidden), freeze(readonly))
+
+        plans = self._fields_plans
+        plan = plans.get(key)
 
-        with temporary_fields_patch(self):
-
-            for field in self:
-                field: EnhancedBoundField
-                field_name = field.name
-                base_field = field.field
-                instance_field = self.fields[field_name]
-
-                made_readonly = False
-                if readonly == all_macro or field_name in readonly:
-                    original_widget = base_field.widget
-
-                    make_read_only = (
-                        # We do not set this widget if already set, since
-                        # it might be a customized subclass.
-                        not isinstance(original_widget, ReadOnlyWidget)
-                        # And we do not set the widget for subforms, since
-                        # they handle readonly by themselves.
-                        and not isinstance(base_field, SubformField)
-                    )
-                    if make_read_only:
-                        widget = get_readonly_cls(field_name)(
-                            bound_field=field,
-                            original_widget=original_widget,
-                        )
-                        base_field.widget = instance_field.disabled = widget
-                    made_readonly = True
+        if plan is None:
+
+            if len(plans) >= 512:
+                plans.clear()
+
+            get_readonly_cls = self._get_widget_readonly_cls
+            all_macro = MACRO_ALL
+            plan = []
+
+            for field_name, field in fields.items():
+                readonly_cls = None
+                make_readonly = readonly == all_macro or field_name in readonly
+
+                # We do not set the widget for subforms, since they handle readonly by themselves.
+                if make_readonly and not isinstance(field, SubformField):
+                    readonly_cls = get_readonly_cls(field_name)
 
                 # Readonly fields are disabled automatically.
-                if made_readonly or (disabled == all_macro or field_name in disabled):
-                    base_field.disabled = instance_field.disabled = True
+                make_disabled = make_readonly or disabled == all_macro or field_name in disabled
+                make_hidden = field_name in hidden
+
+                if make_disabled or make_hidden:
+                    plan.append((field_name, readonly_cls, make_disabled, make_hidden))
+
+            plan = plans[key] = tuple(plan)
+
+        return plan
+
+    def _apply_fields_state(self):
+        # Applies effective fields state (read-only, disabled, hidden)
+        # to fields of this form instance. This is done once, so that
+        # both validation and rendering use the same widgets.
+        if self._fields_state_applied:
+            return
+
+        self._fields_state_applied = True
+        fields = self.fields
+
+        for field_name, readonly_cls, make_disabled, make_hidden in self._get_fields_plan():
+            field = fields[field_name]
 
-                if field_name in hidden:
-                    base_field.widget = instance_field.widget = HiddenInput()
+            if readonly_cls is not None:
+                original_widget = field.widget
 
-            result = callback()
+                # We do not set this widget if already set, since
+                # it might be a customized subclass.
+                # Bound field is set on rendering (see EnhancedBoundField.as_widget()),
+                # so that only bound fields of fields being rendered are constructed.
+                if not isinstance(original_widget, ReadOnlyWidget):
+                    field.widget = readonly_cls(original_widget=original_widget)
 
-        return result
+                # Fields added after form initialization (e.g. primary keys by formsets)
+                # are also to set bound fields for their widgets.
+                field.get_bound_field = MethodType(EnhancedField.get_bound_field, field)
+
+            if make_disabled:
+                field.disabled = True
+
+            if make_hidden:
+                field.widget = HiddenInput()
 
 
 class FilteringSiteformsMixin(SiteformsMixin):
@@ -575,6 +967,13 @@ class FilteringSiteformsMixin(SiteformsMixin):
 
     @classmethod
     def _meta_hook(cls):
+        # Fields might be shared with other form classes (e.g. declared fields
+        # of parent classes), so we patch copies.
+        cls.base_fields = {
+            field_name: field if hasattr(field, '_fltpatched') else deepcopy(field)
+            for field_name, field in cls.base_fields.items()
+        }
+
         super()._meta_hook()
 
         all_macro = MACRO_ALL
@@ -584,10 +983,7 @@ class FilteringSiteformsMixin(SiteformsMixin):
         undef_choice_title = cls.filtering_choice_undefined_title
         undef_choice_value = cls.filtering_choice_undefined_value
 
-        base_fields = cls.base_fields.copy()
-        cls.base_fields = base_fields
-
-        for field_name, field in base_fields.items():
+        for field_name, field in cls.base_fields.items():
 
             if hasattr(field, '_fltpatched'):
                 # prevent subsequent patching
@@ -608,7 +1004,19 @@ class FilteringSiteformsMixin(SiteformsMixin):
 
             if hasattr(field, 'choices') and (fields_choice_undef == all_macro or field_name in fields_choice_undef):
                 field.initial = field.initial or undef_choice_value
-                field.widget.choices.insert(0, (undef_choice_value, undef_choice_title))
+                choice_undef = (undef_choice_value, undef_choice_title)
+
+                if isinstance(field, ModelChoiceField):
+                    # Model choices are to be fetched lazily. Moreover, they are reset
+                    # for every form instance (see ModelChoiceField.__deepcopy__()),
+                    # so an <undefined> item is yielded by the iterator itself.
+                    field.iterator = type(field.iterator.__name__, (ChoicesLeadingMixin, field.iterator), {
+                        'choices_leading': (choice_undef,),
+                    })
+                    field.widget.choices = field.choices
+
+                else:
+                    field.widget.choices = [choice_undef, *field.widget.choices]
 
             field._fltpatched = True
 
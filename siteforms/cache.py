@@ -0,0 +1,477 @@
+import re
+import sys
+from hashlib import md5
+from typing import Optional, Type, Union, Any, Tuple, Callable, Iterable, Awaitable
+
+from django.core.cache import caches, BaseCache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models import Model
+from django.db.models.signals import post_save, m2m_changed
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.utils.translation import get_language
+
+from .utils import UNSET
+
+if False:  # pragma: nocover
+    from .base import SiteformsMixin  # noqa
+
+
+CACHE_PREFIX = 'siteforms'
+"""Prefix for cache keys used by siteforms."""
+
+RE_CSRF_VALUE = re.compile('<input type="hidden" name="csrfmiddlewaretoken" value="([^"]*)">')
+
+TypeParts = Tuple[str, ...]
+
+
+def get_cache(form: 'SiteformsMixin') -> BaseCache:
+    """Returns cache object to be used for the given form.
+
+    :param form:
+
+    """
+    return caches[form.render_cache_alias]
+
+
+def get_cache_timeout(value: Union[bool, int]) -> Any:
+    """Returns cache timeout for the given setting value (see `render_cache_readonly`).
+
+    :param value:
+
+    """
+    if value is True:
+        return DEFAULT_TIMEOUT
+    return value
+
+
+def get_cls_path(cls: Type) -> Optional[str]:
+    """Returns a path to the given class to be used in cache keys.
+
+    Returns None if the class is not importable by its path
+    (e.g. is defined in a function or created by type()),
+    since different classes might share such a path.
+    Composer classes interned by make_composer() are unique by their paths.
+
+    :param cls:
+
+    """
+    path = f'{cls.__module__}.{cls.__qualname__}'
+
+    if cls.__dict__.get('_interned'):
+        # Unique as long as their bases are.
+        return path if all(get_cls_path(base) for base in cls.__bases__) else None
+
+    obj = sys.modules.get(cls.__module__)
+
+    for name in cls.__qualname__.split('.'):
+        obj = getattr(obj, name, None)
+
+    if obj is not cls:
+        return None
+
+    return path
+
+
+def get_cls_paths(form: 'SiteformsMixin') -> Optional[Tuple[str, str]]:
+    """Returns paths to form and composer classes to be used in cache keys
+    or None if the form can't be cached (see get_cls_path()).
+
+    :param form:
+
+    """
+    form_path = get_cls_path(form.__class__)
+    composer_path = get_cls_path(form.Composer)
+
+    if form_path is None or composer_path is None:
+        return None
+
+    return form_path, composer_path
+
+
+def make_key(*parts: Any, kind: str = 'render') -> str:
+    """Makes a cache key from the given parts.
+
+    :param parts:
+    :param kind:
+
+    """
+    digest = md5('|'.join(f'{part}' for part in parts).encode()).hexdigest()
+    return f'{CACHE_PREFIX}:{kind}:{digest}'
+
+
+def get_generation_key(model: Type[Model], pk: Any) -> str:
+    return f'{CACHE_PREFIX}:gen:{model._meta.label_lower}:{pk}'
+
+
+def get_generation(cache: BaseCache, model: Type[Model], pk: Any) -> int:
+    """Returns current render cache generation for the given model instance.
+
+    :param cache:
+    :param model:
+    :param pk:
+
+    """
+    return cache.get(get_generation_key(model, pk), 0)
+
+
+def invalidate(cache: BaseCache, model: Type[Model], pk: Any):
+    """Invalidates rendered forms cached for the given model instance.
+
+    :param cache:
+    :param model:
+    :param pk:
+
+    """
+    key = get_generation_key(model, pk)
+
+    try:
+        cache.incr(key)
+
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def connect_invalidation(model: Type[Model], *, alias: str):
+    """Connects model signals (post_save, m2m_changed) to invalidate
+    rendered forms cached for model instances.
+
+    :param model:
+    :param alias: Cache alias.
+
+    """
+    uid = f'{CACHE_PREFIX}_{alias}_{model._meta.label_lower}'
+
+    def on_save(sender, instance, **kwargs):
+        invalidate(caches[alias], model, instance.pk)
+
+    def on_m2m(sender, instance, action, pk_set, **kwargs):
+
+        if not action.startswith('post_'):
+            return
+
+        cache = caches[alias]
+
+        if isinstance(instance, model):
+            invalidate(cache, model, instance.pk)
+
+        elif kwargs['model'] is model:
+            # Reverse side: instances of our model are in pk_set.
+            for pk in pk_set or []:
+                invalidate(cache, model, pk)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+
+    for field in model._meta.many_to_many:
+        m2m_changed.connect(on_m2m, sender=field.remote_field.through, weak=False, dispatch_uid=uid)
+
+
+def get_version(form: 'SiteformsMixin', instance: Model) -> Any:
+    """Returns instance version as defined by `render_cache_version`.
+
+    :param form:
+    :param instance:
+
+    """
+    version = form.render_cache_version
+
+    if version is None:
+        return ''
+
+    if callable(version):
+        return version(instance)
+
+    return getattr(instance, version)
+
+
+def get_render_form_tag(form: 'SiteformsMixin') -> bool:
+    render_form_tag = form.composer_render_form_tag
+
+    if render_form_tag is UNSET:
+        render_form_tag = form.get_composer_option('opt_render_form_tag')
+
+    return render_form_tag
+
+
+def get_readonly_key(form: 'SiteformsMixin') -> Optional[str]:
+    """Returns render cache key for a fully read-only form.
+    Returns None if the form can't be cached.
+
+    :param form:
+
+    """
+    if form.readonly_fields != '__all__' or form.is_bound:
+        return None
+
+    instance = getattr(form, 'instance', None)
+    pk = getattr(instance, 'pk', None)
+
+    if pk is None:
+        return None
+
+    render_form_tag = get_render_form_tag(form)
+
+    if render_form_tag and form.request and form.src == 'POST':
+        # Do not cache CSRF tokens.
+        return None
+
+    cls_paths = get_cls_paths(form)
+
+    if cls_paths is None:
+        return None
+
+    model = instance.__class__
+
+    generation = ''
+    if form.render_cache_invalidate:
+        generation = get_generation(get_cache(form), model, pk)
+
+    return make_key(
+        *cls_paths,
+        sorted((name, repr(value)) for name, value in form.composer_options.items()),
+        get_language(),
+        model._meta.label_lower,
+        pk,
+        get_version(form, instance),
+        generation,
+        form.prefix,
+        form.auto_id,
+        form.id,
+        form.target_url,
+        form.src,
+        render_form_tag,
+        sorted(form.hidden_fields),
+    )
+
+
+def get_unbound_key(form: 'SiteformsMixin') -> Optional[str]:
+    """Returns render cache key for an unbound form without a saved instance.
+    Returns None if the form can't be cached.
+
+    :param form:
+
+    """
+    if form.is_bound:
+        return None
+
+    if getattr(getattr(form, 'instance', None), 'pk', None) is not None:
+        return None
+
+    cls_paths = get_cls_paths(form)
+
+    if cls_paths is None:
+        return None
+
+    render_form_tag = get_render_form_tag(form)
+
+    def get_fields(value):
+        return value if isinstance(value, str) else sorted(value)
+
+    return make_key(
+        *cls_paths,
+        sorted((name, repr(value)) for name, value in form.composer_options.items()),
+        get_language(),
+        form.prefix,
+        form.auto_id,
+        form.id,
+        form.target_url,
+        form.src,
+        render_form_tag,
+        # CSRF token is spliced on every render.
+        bool(render_form_tag and form.request and form.src == 'POST'),
+        form.submit_marker,
+        get_fields(form.hidden_fields),
+        get_fields(form.disabled_fields),
+        get_fields(form.readonly_fields),
+        sorted((name, repr(value)) for name, value in form.initial.items()),
+        kind='unbound',
+    )
+
+
+def get_fragment_key(form: 'SiteformsMixin', vary: Iterable[Any] = ()) -> Optional[str]:
+    """Returns cache key for a form rendered by {% siteform %} template tag.
+    Returns None if the form can't be cached (bound forms, debug mode).
+
+    :param form:
+    :param vary: Additional values to vary cache on (e.g. user ID).
+
+    """
+    if form.is_bound or form.is_submitted or form.get_composer()._debug:
+        return None
+
+    cls_paths = get_cls_paths(form)
+
+    if cls_paths is None:
+        return None
+
+    instance_parts = ()
+    instance = getattr(form, 'instance', None)
+    pk = getattr(instance, 'pk', None)
+
+    if pk is not None:
+        model = instance.__class__
+
+        generation = ''
+        if form.render_cache_invalidate:
+            generation = get_generation(get_cache(form), model, pk)
+
+        instance_parts = (model._meta.label_lower, pk, get_version(form, instance), generation)
+
+    render_form_tag = get_render_form_tag(form)
+
+    def get_fields(value):
+        return value if isinstance(value, str) else sorted(value)
+
+    return make_key(
+        *cls_paths,
+        sorted((name, repr(value)) for name, value in form.composer_options.items()),
+        get_language(),
+        *instance_parts,
+        form.prefix,
+        form.auto_id,
+        form.id,
+        form.target_url,
+        form.src,
+        render_form_tag,
+        # CSRF token is spliced on every render.
+        bool(render_form_tag and form.request and form.src == 'POST'),
+        form.submit_marker,
+        get_fields(form.hidden_fields),
+        get_fields(form.disabled_fields),
+        get_fields(form.readonly_fields),
+        # Initial includes instance fields values for model forms.
+        sorted((name, repr(value)) for name, value in form.initial.items()),
+        [repr(value) for value in vary],
+        kind='fragment',
+    )
+
+
+def split_csrf(html: str) -> TypeParts:
+    """Splits rendered HTML by CSRF token value, so that
+    a new token could be put in place (see join_csrf()).
+
+    :param html:
+
+    """
+    match = RE_CSRF_VALUE.search(html)
+
+    if match is None:
+        return html,
+
+    return html[:match.start(1)], html[match.end(1):]
+
+
+def join_csrf(parts: TypeParts, request: Optional[HttpRequest]) -> str:
+    """Joins HTML parts (see split_csrf()) putting a CSRF token for the given request.
+
+    :param parts:
+    :param request:
+
+    """
+    if len(parts) == 1:
+        return parts[0]
+
+    return get_token(request).join(parts)
+
+
+def get_render_key(form: 'SiteformsMixin') -> Tuple[Optional[str], Any]:
+    """Returns render cache key and timeout setting value for the given form
+    if caching is allowed by form settings (see `render_cache_readonly`, `render_cache_unbound`).
+    Returns None as a key if the form can't be cached.
+
+    :param form:
+
+    """
+    cache_key = None
+
+    if form.get_composer()._debug:
+        # Debug annotations are not to be cached.
+        return cache_key, None
+
+    cache_timeout = form.render_cache_readonly
+    if cache_timeout:
+        cache_key = get_readonly_key(form)
+
+    if not cache_key:
+        cache_timeout = form.render_cache_unbound
+        if cache_timeout:
+            cache_key = get_unbound_key(form)
+
+    return cache_key, cache_timeout
+
+
+def render_cached(form: 'SiteformsMixin', *, render: Callable[[], str]) -> str:
+    """Renders the given form using cache if allowed by form settings
+    (see `render_cache_readonly`, `render_cache_unbound`).
+
+    :param form:
+    :param render: Function to render the form on cache miss.
+
+    """
+    cache_key, cache_timeout = get_render_key(form)
+
+    if not cache_key:
+        return render()
+
+    cache = get_cache(form)
+    parts = cache.get(cache_key)
+
+    if parts is None:
+        rendered = render()
+        cache.set(cache_key, split_csrf(rendered), get_cache_timeout(cache_timeout))
+        return rendered
+
+    return join_csrf(parts, form.request)
+
+
+async def arender_cached(form: 'SiteformsMixin', *, render: Callable[[], Awaitable[str]]) -> str:
+    """Asynchronous version of render_cached().
+
+    :param form:
+    :param render: Coroutine function to render the form on cache miss.
+
+    """
+    cache_key, cache_timeout = get_render_key(form)
+
+    if not cache_key:
+        return await render()
+
+    cache = get_cache(form)
+    parts = await cache.aget(cache_key)
+
+    if parts is None:
+        rendered = await render()
+        await cache.aset(cache_key, split_csrf(rendered), get_cache_timeout(cache_timeout))
+        return rendered
+
+    return join_csrf(parts, form.request)
+
+
+def render_fragment(
+        form: 'SiteformsMixin',
+        *,
+        vary: Iterable[Any] = (),
+        timeout: Any = DEFAULT_TIMEOUT,
+) -> str:
+    """Renders the given form using fragment cache (see {% siteform %} template tag).
+    Bound forms are rendered without cache.
+
+    :param form:
+    :param vary: Additional values to vary cache on (e.g. user ID).
+    :param timeout: Cache timeout in seconds.
+
+    """
+    cache_key = get_fragment_key(form, vary)
+
+    if cache_key is None:
+        return form.render()
+
+    cache = get_cache(form)
+    parts = cache.get(cache_key)
+
+    if parts is None:
+        rendered = form.render()
+        cache.set(cache_key, split_csrf(rendered), timeout)
+        return rendered
+
+    return join_csrf(parts, form.request)
@@ -1,20 +1,29 @@
-from collections import defaultdict
-from functools import partial
-from typing import Dict, Any, Optional, Union, List, Type, TypeVar
-
-from django.forms import BoundField, CheckboxInput, Form
+import re
+from hashlib import md5
+from functools import partial, lru_cache
+from string import Formatter
+from time import perf_counter
+from typing import Dict, Any, Optional, Union, List, Type, TypeVar, Tuple, Iterable, Generator, Callable
+
+from django.conf import settings
+from django.db import connection
+from django.forms import BoundField, CheckboxInput, Form, Widget
 from django.forms.utils import flatatt
 from django.forms.widgets import Input
 from django.middleware.csrf import get_token
+from django.utils.html import escape
+from django.utils.http import urlencode
 from django.utils.translation import gettext_lazy as _
 
-from ..utils import merge_dict, UNSET
-from ..widgets import ReadOnlyWidget
+from ..utils import merge_dict, UNSET, render_async
+from ..renderers import render_native, render_readonly
+from ..widgets import ReadOnlyWidget, SubformWidget
 
 if False:  # pragma: nocover
     from ..base import SiteformsMixin  # noqa
 
 TypeAttrs = Dict[Union[str, Type[Input]], Any]
+TypeChunks = Generator[str, None, None]
 
 
 ALL_FIELDS = '__fields__'
@@ -43,8 +52,82 @@ SUBMIT = '__submit__'
 
 _VALUE = '__value__'
 
+_MARK_SUBFORM = '\x00subform\x00'
+
+_OP_SET = 0
+_OP_APPEND = 1
+_OP_CALL = 2
+
 TypeComposer = TypeVar('TypeComposer', bound='FormComposer')
 
+_composers: Dict[tuple, Type['FormComposer']] = {}
+"""Interned composer classes. See make_composer()."""
+
+_composers_max: int = 1024
+
+
+def get_css_sizer(terms: Tuple[str, ...], size: str) -> Callable[[str], str]:
+    """Returns a function to apply size modifier (e.g. `sm`) to CSS classes
+    from the given terms (e.g. `form-control` -> `form-control form-control-sm`).
+
+    Previously applied modifiers are replaced, so sizing is idempotent.
+
+    :param terms: CSS classes to apply size modifier to.
+    :param size: Size alias. Empty string to remove sizing.
+
+    """
+    pattern = re.compile(
+        r'(?<![\w-])(%s)(?: \1-(?:sm|lg))?(?![\w-])' % '|'.join(re.escape(term) for term in terms))
+    replacement = rf'\1 \1-{size}' if size else r'\1'
+
+    def size_css(value: str) -> str:
+        return pattern.sub(replacement, value)
+
+    return size_css
+
+
+def size_attrs(cls: Type['FormComposer'], sizer: Callable[[str], str]):
+    """Applies CSS sizing to composer class attributes.
+
+    Static values are sized right away, callables are wrapped
+    to size their results.
+
+    :param cls: Composer class.
+    :param sizer: See get_css_sizer().
+
+    """
+    def size_callable(func: Callable) -> Callable:
+        func = getattr(func, 'unsized', func)
+
+        def sized(*args):
+            value = func(*args)
+            if isinstance(value, str):
+                value = sizer(value)
+            return value
+
+        sized.unsized = func
+        return sized
+
+    def size_value(value: Any) -> Any:
+        if callable(value):
+            return size_callable(value)
+        if isinstance(value, str):
+            return sizer(value)
+        return value
+
+    for attr in ('attrs', 'attrs_labels', 'attrs_help', 'attrs_feedback'):
+        sized = {}
+
+        for key, attrs in (getattr(cls, attr) or {}).items():
+            if isinstance(attrs, dict) and 'class' in attrs:
+                attrs = {**attrs, 'class': size_value(attrs['class'])}
+            sized[key] = attrs
+
+        setattr(cls, attr, sized)
+
+    for attr in ('wrappers', 'layout'):
+        setattr(cls, attr, {key: size_value(value) for key, value in getattr(cls, attr).items()})
+
 
 class FormatDict(dict):
 
@@ -52,6 +135,70 @@ class FormatDict(dict):
         return ''
 
 
+TypeTemplate = Tuple[str, Tuple[Tuple[str, str], ...], Tuple[str, ...]]
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str) -> Optional[TypeTemplate]:
+    """Compiles a format string (e.g. from wrappers or layout)
+    into segments, to be used instead of str.format_map().
+
+    Returns a tuple: (head_literal, ((placeholder_name, literal), ...), placeholder_names).
+    Returns None for templates using conversions, format specs or lookups.
+
+    :param template:
+
+    """
+    head = ''
+    pairs = []
+    names = []
+
+    try:
+        for literal, name, spec, conversion in Formatter().parse(template):
+
+            if pairs:
+                pairs[-1] = (pairs[-1][0], pairs[-1][1] + literal)
+            else:
+                head += literal
+
+            if name is None:
+                continue
+
+            if spec or conversion or not name.isidentifier():
+                return None
+
+            pairs.append((name, ''))
+            names.append(name)
+
+    except ValueError:
+        # Let str.format_map() report the problem.
+        return None
+
+    return head, tuple(pairs), tuple(names)
+
+
+RE_SPACE_TAGS = re.compile(r'>\s+<')
+RE_TAGS_PRESERVE = re.compile(r'<(pre|textarea)\b', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def minify_template(template: str) -> str:
+    """Removes redundant whitespace from a format string (e.g. from wrappers or layout):
+    between tags and before `{attrs}` placeholder (flat attributes start with a space).
+
+    Whitespace between tags is preserved for templates containing <pre> and <textarea>.
+
+    :param template:
+
+    """
+    template = template.replace(' {attrs}', '{attrs}')
+
+    if RE_TAGS_PRESERVE.search(template):
+        return template
+
+    return RE_SPACE_TAGS.sub('><', template).strip()
+
+
 class FormComposer:
     """Base form composer."""
     
@@ -94,6 +241,73 @@ class FormComposer:
     opt_submit_name: str = '__submit'
     """Submit button name."""
 
+    opt_formset_stencil: bool = False
+    """Render forms in formsets using a stencil compiled once from a formset empty form.
+    Labels, hints, wrappers and attributes are taken from the stencil,
+    while widgets (with values) and feedback are rendered for every form.
+
+    .. note:: Do not switch on if attributes, wrappers, labels or hints of your forms
+        depend on form data or are changed in form __init__().
+
+    """
+
+    opt_widgets_fast: bool = False
+    """Render standard widgets (text inputs, checkboxes, textareas, selects)
+    without the template engine. Custom widgets are rendered as usual.
+
+    .. note:: Applies only for the default Django form renderer (stock widget templates).
+
+    """
+
+    opt_deferred_param: str = '__group'
+    """GET parameter name to pass a deferred group alias in (see `groups_deferred`).
+    Form prefix is prepended to the name.
+
+    """
+
+    opt_deferred_marker: str = '__group_loaded'
+    """Name of a hidden input rendered within deferred groups (see `groups_deferred`)
+    to let a submitted form know what groups were loaded by a client.
+    Form prefix is prepended to the name.
+
+    """
+
+    opt_readonly_fast: bool = False
+    """Render read-only fields (see `readonly_fields`) using value formatters
+    compiled once per field instead of widget rendering machinery.
+    Customized read-only widgets (ReadOnlyWidget subclasses) are rendered as usual.
+
+    """
+
+    opt_box_ids: bool = False
+    """Wrap field boxes and non-field feedback into elements with IDs,
+    so that they could be addressed on a page, e.g. to be replaced
+    with fragments from SiteformsMixin.render_errors().
+
+    Wrapping elements use `display: contents` style not to affect layout.
+
+    """
+
+    opt_minify: bool = False
+    """Produce compact HTML: no line breaks between fields, rows and groups,
+    no redundant whitespace in wrappers, layout and tags with attributes.
+
+    Widgets output (e.g. <textarea> contents) is kept intact.
+
+    """
+
+    opt_debug: Optional[bool] = None
+    """Annotate rendered HTML for profiling: field boxes, groups and subforms
+    are wrapped into HTML comments with composer and widget classes,
+    render time and a number of database queries performed.
+
+    If not set, subforms inherit the mode from their parent forms,
+    and for other forms SITEFORMS_DEBUG from Django settings is used (default: False).
+
+    .. note:: Render caches and formset stencils are not used in this mode.
+
+    """
+
     ########################################################
 
     attrs_labels: TypeAttrs = None
@@ -112,6 +326,22 @@ class FormComposer:
     groups: Dict[str, str] = None
     """Map alias to group titles."""
 
+    groups_deferred: Iterable[str] = None
+    """Aliases of groups (see `layout[FORM]`) to be rendered on demand.
+
+    A lightweight placeholder is rendered in place of such a group:
+
+        <div data-siteforms-deferred="{alias}" data-url="{url}"></div>
+
+    URL points to the form target URL with a GET parameter (see `opt_deferred_param`),
+    and could be used by a client to fetch group HTML (see SiteformsMixin.render_deferred()).
+
+    Group HTML includes a hidden marker input (see `opt_deferred_marker`).
+    Fields of groups not loaded into a submitted form are neither cleaned nor saved,
+    and such groups are rendered as placeholders again. Loaded groups are rendered in full.
+
+    """
+
     wrappers: TypeAttrs = {
         ALL_FIELDS: '<span>{field}</span>',
         ALL_ROWS: '<div {attrs}>{fields}</div>',
@@ -130,11 +360,51 @@ class FormComposer:
 
     ########################################################
 
-    def __init__(self, form: Union['SiteformsMixin', Form]):
+    _attrs_plans: Dict[tuple, tuple] = {}
+    """Compiled attributes resolution plans. Populated on first use."""
+
+    _layout_plans: Dict[tuple, tuple] = {}
+    """Compiled form layout render plans. Populated on first use."""
+
+    _opts_static: Tuple[str, ...] = ()
+    """Options applied on class creation. These can't be overridden for an instance."""
+
+    def __init__(self, form: Union['SiteformsMixin', Form], *, options: Dict[str, Any] = None):
+        """
+        :param form: Form to compose.
+
+        :param options: Options (opt_*) to override for this composer instance,
+            e.g. {'opt_render_labels': False}. Use make_composer() for other attributes.
+
+        """
         self.form = form
         self.groups = self.groups or {}
         self.attrs_feedback = self.attrs_feedback or {}
 
+        for name, value in (options or {}).items():
+
+            if not name.startswith('opt_') or not hasattr(self, name):
+                raise ValueError(f'Unknown composer option: {name}')
+
+            if name in self._opts_static:
+                raise ValueError(
+                    f'Option {name} is applied on composer class creation and '
+                    f'can not be overridden for an instance. Use make_composer() instead.')
+
+            setattr(self, name, value)
+
+        debug = self.opt_debug
+        if debug is None:
+            parent = getattr(form, 'parent', None)
+
+            if parent is None:
+                debug = getattr(settings, 'SITEFORMS_DEBUG', False)
+
+            else:
+                debug = parent.get_composer()._debug
+
+        self._debug = bool(debug)
+
     def __init_subclass__(cls) -> None:
         # Implements attributes enrichment - inherits attrs values from parents.
         super().__init_subclass__()
@@ -155,6 +425,10 @@ class FormComposer:
         enrich_attr('layout')
         cls._hook_init_subclass()
 
+        # Plans are compiled against the final (enriched) attributes.
+        cls._attrs_plans = {}
+        cls._layout_plans = {}
+
     @classmethod
     def _hook_init_subclass(cls):
         """"""
@@ -238,7 +512,139 @@ class FormComposer:
 
         return attrs
 
+    @classmethod
+    def _attrs_compile(cls, container: Dict[str, Any], widget_cls: Type, name: str) -> tuple:
+        """Compiles attributes resolution plan for a field.
+
+        Static values are merged beforehand, so only callables
+        are left to be evaluated on render.
+
+        Returns a tuple: (static_attrs, entries). If `static_attrs` is not None
+        it is ready to be used as is. Otherwise `entries` are to be resolved.
+        If both are None, plan can't be compiled and generic resolution is used.
+
+        :param container:
+        :param widget_cls:
+        :param name:
+
+        """
+        items = [ALL_FIELDS, widget_cls, name]
+
+        if issubclass(widget_cls, ReadOnlyWidget):
+            items.append(FIELDS_READONLY)
+
+        ops = {}
+
+        for item in items:
+            attrs = container.get(item)
+
+            if not attrs:
+                continue
+
+            if not isinstance(attrs, dict):
+                attrs = {_VALUE: attrs}
+
+            for key, val in attrs.items():
+
+                if callable(val):
+                    op = _OP_CALL
+
+                elif val is None:
+                    continue
+
+                else:
+                    op = _OP_SET
+                    val_str = f'{val}'
+                    if val_str[:1] == '+':
+                        op = _OP_APPEND
+                        val = val_str[1:]
+
+                ops.setdefault(key, []).append((op, val))
+
+        entries = []
+        dynamic = False
+
+        for key, key_ops in ops.items():
+
+            if key_ops[0][0] == _OP_CALL and len(key_ops) > 1:
+                # Key position in resulting dict depends on callable result.
+                # Let generic resolution handle this rare case.
+                return None, None
+
+            value = None
+            idx = 0
+
+            for idx, (op, val) in enumerate(key_ops):
+                if op == _OP_CALL:
+                    break
+                if op == _OP_APPEND:
+                    val = f"{'' if value is None else value} {val}"
+                value = val
+
+            else:
+                idx = len(key_ops)
+
+            runtime_ops = tuple(key_ops[idx:])
+            dynamic = dynamic or bool(runtime_ops)
+
+            entries.append((key, value, runtime_ops))
+
+        if dynamic:
+            return None, tuple(entries)
+
+        return {key: value for key, value, _ in entries}, None
+
     def _attrs_get_basic(self, container: Dict[str, Any], field: BoundField):
+
+        if not container:
+            return {}
+
+        widget_cls = field.field.widget.__class__
+        plans = self._attrs_plans
+        plan_key = (id(container), widget_cls, field.name)
+        plan = plans.get(plan_key)
+
+        if plan is None or plan[0] is not container:
+            # Keeping the container itself guards against id reuse.
+            plan = (container, *self._attrs_compile(container, widget_cls, field.name))
+            plans[plan_key] = plan
+
+        _, static, entries = plan
+
+        if static is not None:
+            return static.copy()
+
+        if entries is None:
+            return self._attrs_get_basic_generic(container, field)
+
+        attrs = {}
+
+        for key, value, runtime_ops in entries:
+
+            for op, val in runtime_ops:
+
+                if op == _OP_CALL:
+                    val = val(self, field)
+
+                    if val is None:
+                        continue
+
+                    val_str = f'{val}'
+                    if val_str[:1] == '+':
+                        op = _OP_APPEND
+                        val = val_str[1:]
+
+                if op == _OP_APPEND:
+                    val = f"{'' if value is None else value} {val}"
+
+                value = val
+
+            if value is not None:
+                attrs[key] = value
+
+        return attrs
+
+    def _attrs_get_basic_generic(self, container: Dict[str, Any], field: BoundField):
         attrs = {}
         get_attrs = partial(self._attrs_get, container, obj=field, accumulated=attrs)
 
@@ -279,13 +685,31 @@ class FormComposer:
                 elif title_help:
                     attrs['title'] = field.help_text
 
-        out = field.as_widget(attrs=attrs)
+        out = self._render_widget(field, attrs)
 
         if field.field.show_hidden_initial:
             out += field.as_hidden(only_initial=True)
 
         return f'{out}'
 
+    def _render_widget(self, field: BoundField, attrs: TypeAttrs) -> str:
+
+        if isinstance(field.field.widget, SubformWidget):
+            # Subform contents are streamed separately (see ._iter_field_box()).
+            return _MARK_SUBFORM
+
+        if self.opt_readonly_fast:
+            rendered = render_readonly(field, attrs)
+            if rendered is not None:
+                return rendered
+
+        if self.opt_widgets_fast:
+            rendered = render_native(field, attrs)
+            if rendered is not None:
+                return rendered
+
+        return field.as_widget(attrs=attrs)
+
     def _render_label(self, field: BoundField) -> str:
         label = field.label_tag(
             attrs=self._attrs_get_basic(self.attrs_labels, field),
@@ -299,9 +723,20 @@ class FormComposer:
         )
         return f'{label}'
 
+    @property
+    def _sep(self) -> str:
+        # Separator for fields, rows and groups.
+        return '' if self.opt_minify else '\n'
+
+    def _flatatt(self, attrs: TypeAttrs) -> str:
+        # Attributes to be put right after a tag name.
+        if self.opt_minify:
+            return flatatt(attrs)
+        return f' {flatatt(attrs)}'
+
     def _format_feedback_lines(self, errors: List) -> str:
         tag = self.opt_tag_feedback_line
-        return '\n'.join([f'<{tag}>{error}</{tag}>' for error in errors])
+        return self._sep.join([f'<{tag}>{error}</{tag}>' for error in errors])
 
     def _render_feedback(self, field: BoundField) -> str:
 
@@ -316,17 +751,32 @@ class FormComposer:
 
         if field.is_hidden:
             # Gather hidden field errors into non-field group.
+            # Gathered only once, since a form may be rendered more than once.
+            gathered = list(form.non_field_errors())
+
             for error in errors:
-                form.add_error(
-                    None,
-                    _('Hidden field "%(name)s": %(error)s') %
-                    {'name': field.name, 'error': str(error)})
+                error = _('Hidden field "%(name)s": %(error)s') % {'name': field.name, 'error': str(error)}
+
+                if error not in gathered:
+                    form.add_error(None, error)
+
             return ''
 
         attrs = self._attrs_get_basic(self.attrs_feedback, field)
         tag = self.opt_tag_feedback
 
-        return f'<{tag} {flatatt(attrs)}>{self._format_feedback_lines(errors)}</{tag}>'
+        return f'<{tag}{self._flatatt(attrs)}>{self._format_feedback_lines(errors)}</{tag}>'
+
+    def _gather_feedback_hidden(self):
+        # Hidden fields errors are gathered into non-field group
+        # beforehand, since non-field feedback is rendered first.
+        form = self.form
+        render_feedback = self._render_feedback
+
+        for name in form.fields:
+            field = form[name]
+            if field.is_hidden:
+                render_feedback(field)
 
     def _render_feedback_nonfield(self) -> str:
         errors = self.form.non_field_errors()
@@ -335,7 +785,7 @@ class FormComposer:
 
         attrs = self.attrs_feedback.get(FORM, {})
         tag = self.opt_tag_feedback
-        return f'<{tag} {flatatt(attrs)}>{self._format_feedback_lines(errors)}</{tag}>'
+        return f'<{tag}{self._flatatt(attrs)}>{self._format_feedback_lines(errors)}</{tag}>'
 
     def _render_help(self, field: BoundField) -> str:
         help_text = field.help_text
@@ -347,10 +797,64 @@ class FormComposer:
         attrs['id'] = f'{field.id_for_label}_help'
         tag = self.opt_tag_help
 
-        return f'<{tag} {flatatt(attrs)}>{help_text}</{tag}>'
+        return f'<{tag}{self._flatatt(attrs)}>{help_text}</{tag}>'
 
     def _format_value(self, src: dict, **kwargs) -> str:
-        return src[_VALUE].format_map(FormatDict(**kwargs))
+        template = self._get_template(src)
+        compiled = compile_template(template) if isinstance(template, str) else None
+
+        if compiled is None:
+            return template.format_map(FormatDict(**kwargs))
+
+        head, pairs, _ = compiled
+        get_value = kwargs.get
+        out = [head]
+
+        for placeholder, literal in pairs:
+            out.append(f"{get_value(placeholder, '')}")
+            out.append(literal)
+
+        return ''.join(out)
+
+    def _get_template(self, src: dict) -> Any:
+        template = src[_VALUE]
+
+        if self.opt_minify and isinstance(template, str):
+            return minify_template(template)
+
+        return template
+
+    def _iter_format(self, src: dict, name: str, content: Iterable[str], **kwargs) -> TypeChunks:
+        # Formats value yielding chunks of the given content
+        # in place of the `name` placeholder.
+        template = self._get_template(src)
+        compiled = compile_template(template) if isinstance(template, str) else None
+
+        if compiled is None or compiled[2].count(name) != 1:
+            yield self._format_value(src, **kwargs, **{name: ''.join(content)})
+            return
+
+        head, pairs, _ = compiled
+        get_value = kwargs.get
+        buffer = [head]
+
+        for placeholder, literal in pairs:
+
+            if placeholder == name:
+                chunk = ''.join(buffer)
+                if chunk:
+                    yield chunk
+                buffer = []
+                yield from content
+
+            else:
+                buffer.append(f"{get_value(placeholder, '')}")
+
+            buffer.append(literal)
+
+        chunk = ''.join(buffer)
+        if chunk:
+            yield chunk
 
     def _apply_layout(self, *, fld: BoundField, field: str, label: str, hint: str, feedback: str) -> str:
         return self._format_value(
@@ -367,10 +871,10 @@ class FormComposer:
             field=content,
         )
 
-    def _render_field_box(self, field: BoundField) -> str:
+    def _compose_field_box(self, field: BoundField) -> str:
+        # Subform contents in the result are represented by a marker.
 
         if field.is_hidden:
-            self._render_feedback(field)
             return str(field)
 
         label = ''
@@ -392,146 +896,458 @@ class FormComposer:
 
         return self._apply_wrapper(fld=field, content=out)
 
-    def _render_group(self, alias: str, *, rows: List[Union[BoundField, List[BoundField]]]) -> str:
+    def get_box_id(self, field: Optional[BoundField] = None) -> str:
+        """Returns an ID of an element wrapping a field box (see `opt_box_ids`).
 
-        get_attrs = self._attrs_get
-        attrs = self.attrs
-        wrappers = self.wrappers
-        format_value = self._format_value
-        render_field_box = self._render_field_box
+        :param field: If not set, an ID for non-field feedback element is returned.
+
+        """
+        if field is None:
+            return f"{self.form.add_prefix('__nonfield')}_box"
+        return f'{field.auto_id or field.html_name}_box'
 
-        def get_group_params(container: dict) -> dict:
-            get_params = partial(get_attrs, container)
-            return {**get_params(ALL_GROUPS), **get_params(alias)}
+    def _iter_box(self, box_id: str, chunks: Iterable[str]) -> TypeChunks:
+        yield f'<div id="{box_id}" style="display: contents">'
+        yield from chunks
+        yield '</div>'
 
-        def render(field: Union[BoundField, List[Union[BoundField, str]]], wrap: bool = False) -> str:
+    def _iter_debug(self, kind: str, name: str, chunks: Iterable[str], *, details: str = '') -> TypeChunks:
+        # Wraps chunks into comments with render time and database queries count (see `opt_debug`).
+        # Only time spent on producing chunks is taken into account.
+        queries = []
 
-            if isinstance(field, list):
-                out = []
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
 
-                for subfield in field:
+        label = f'{kind} {name}'.replace('--', '- -')
+        details = f'{self.__class__.__qualname__}{details}'.replace('--', '- -')
 
-                    if isinstance(subfield, list):
-                        rendered = render(subfield, wrap=len(subfield) > 1)
+        yield f'<!-- siteforms {label}: {details} -->'
 
-                    elif isinstance(subfield, str):
-                        rendered = subfield
+        elapsed = 0
+        chunks = iter(chunks)
 
-                    else:
-                        rendered = render_field_box(subfield)
+        while True:
+            started = perf_counter()
+
+            try:
+                # Queries are counted only while producing a chunk,
+                # not while a consumer handles it.
+                with connection.execute_wrapper(count):
+                    chunk = next(chunks)
+
+            except StopIteration:
+                elapsed += perf_counter() - started
+                break
+
+            elapsed += perf_counter() - started
+            yield chunk
+
+        yield f'<!-- /siteforms {label}: {elapsed * 1000:.3f} ms, {len(queries)} queries -->'
+
+    def _iter_field_box(self, field: BoundField) -> TypeChunks:
+        chunks = self._iter_field_box_contents(field)
+
+        if self.opt_box_ids and not field.is_hidden:
+            chunks = self._iter_box(self.get_box_id(field), chunks)
+
+        if self._debug:
+            widget: Widget = field.field.widget
+            chunks = self._iter_debug('field', field.name, chunks, details=f', {widget.__class__.__qualname__}')
+
+        yield from chunks
+
+    def _iter_field_box_contents(self, field: BoundField) -> TypeChunks:
+        box = self._compose_field_box(field)
+        parts = box.split(_MARK_SUBFORM)
+
+        if len(parts) == 1:
+            yield box
+            return
+
+        subform = field.form.get_subform(name=field.html_name)
+        chunks = subform.iter_render()
+
+        if self._debug:
+            chunks = self._iter_debug('subform', field.name, chunks, details=f', {subform.__class__.__qualname__}')
 
-                    out.append(rendered)
+        if len(parts) == 2:
+            head, tail = parts
+            yield head
+            yield from chunks
+            yield tail
 
-                out = '\n'.join(out)
-                if wrap:
-                    out = format_value(wrapper_stacked, field=out)
+        else:  # pragma: nocover
+            yield ''.join(chunks).join(parts)
 
-                return out
+    def _render_field_box(self, field: BoundField) -> str:
+        return ''.join(self._iter_field_box(field))
+
+    def _iter_row(self, fields: Union[BoundField, List[Union[BoundField, str, list]]], *, wrap: bool = False) -> TypeChunks:
+
+        if not isinstance(fields, list):
+            yield from self._iter_field_box(fields)
+            return
+
+        def iter_subfields():
+            for idx, subfield in enumerate(fields):
+
+                if idx:
+                    yield self._sep
+
+                if isinstance(subfield, list):
+                    yield from self._iter_row(subfield, wrap=len(subfield) > 1)
+
+                elif isinstance(subfield, str):
+                    yield subfield
+
+                else:
+                    yield from self._iter_field_box(subfield)
+
+        if wrap:
+            yield from self._iter_format(
+                self._attrs_get(self.wrappers, FIELDS_STACKED), 'field', iter_subfields())
+
+        else:
+            yield from iter_subfields()
 
-            return render_field_box(field)
+    def _render_row(self, fields: Union[BoundField, List[Union[BoundField, str, list]]], *, wrap: bool = False) -> str:
+        return ''.join(self._iter_row(fields, wrap=wrap))
+
+    def _iter_group(self, alias: str, *, rows: List[Union[BoundField, List[BoundField]]]) -> TypeChunks:
+        chunks = self._iter_group_contents(alias, rows=rows)
+
+        if alias in (self.groups_deferred or ()):
+            chunks = self._iter_group_deferred_marked(alias, chunks)
+
+        if self._debug:
+            chunks = self._iter_debug('group', alias, chunks)
+
+        yield from chunks
+
+    def _iter_group_deferred_marked(self, alias: str, chunks: TypeChunks) -> TypeChunks:
+        name = self.form.add_prefix(self.opt_deferred_marker)
+        yield f'<input type="hidden" name="{escape(name)}" value="{escape(alias)}">'
+        yield from chunks
+
+    def _iter_group_contents(self, alias: str, *, rows: List[Union[BoundField, List[BoundField]]]) -> TypeChunks:
+
+        get_attrs = self._attrs_get
+        attrs = self.attrs
+        wrappers = self.wrappers
+        iter_format = self._iter_format
+        iter_row = self._iter_row
 
-        wrapper_stacked = get_attrs(wrappers, FIELDS_STACKED)
         wrapper_rows = get_attrs(wrappers, ALL_ROWS)
 
-        html = format_value(
-            get_group_params(wrappers),
-            attrs=flatatt(get_group_params(attrs)),
-            title=self.groups.get(alias, ''),
-            rows='\n'.join(
-                format_value(
-                    wrapper_rows,
+        def iter_rows():
+            for idx, fields in enumerate(rows):
+
+                if idx:
+                    yield self._sep
+
+                yield from iter_format(
+                    wrapper_rows, 'fields', iter_row(fields),
                     attrs=flatatt(get_attrs(attrs, ALL_ROWS, obj=fields)),
-                    fields=render(fields),
                 )
-                for fields in rows
-            )
+
+        yield from iter_format(
+            {**get_attrs(wrappers, ALL_GROUPS), **get_attrs(wrappers, alias)}, 'rows', iter_rows(),
+            attrs=flatatt({**get_attrs(attrs, ALL_GROUPS), **get_attrs(attrs, alias)}),
+            title=self.groups.get(alias, ''),
         )
 
-        return html
+    def _render_group(self, alias: str, *, rows: List[Union[BoundField, List[BoundField]]]) -> str:
+        return ''.join(self._iter_group(alias, rows=rows))
+
+    @classmethod
+    def _layout_compile(cls, field_names: Tuple[str, ...]) -> tuple:
+        """Compiles form layout (see `layout[FORM]`) into a render plan
+        for the given field names.
 
-    def _render_layout(self) -> str:
-        form = self.form
+        Returns a tuple: (fields, groups, leftovers).
 
-        fields = {name: form[name] for name in form.fields}
+        * fields - field names to render one by one (no grouping) or None;
+        * groups - a tuple of (group_alias, rows) pairs, where rows mimic
+          layout structure but hold field names (None for unknown names in rows);
+        * leftovers - field names not addressed by the layout
+          (those of them being hidden are still rendered).
 
-        form_layout = self.layout[FORM]
+        :param field_names:
 
-        out = []
+        """
+        form_layout = cls.layout[FORM]
 
         if isinstance(form_layout, str):
             # Simple layout defined by macros.
 
             if form_layout == ALL_FIELDS:
                 # all fields, no grouping
-                render_field_box = self._render_field_box
-                out.extend(render_field_box(field) for field in fields.values())
+                return field_names, None, ()
 
-            else:  # pragma: nocover
-                raise ValueError(f'Unsupported form layout macros: {form_layout}')
+            raise ValueError(f'Unsupported form layout macros: {form_layout}')
 
-        elif isinstance(form_layout, dict):
-            # Advanced layout with groups.
-            render_group = self._render_group
-            grouped = defaultdict(list)
+        # Advanced layout with groups.
+        fields = dict.fromkeys(field_names)
+        groups = []
 
-            def add_fields_left():
-                group.extend([[field] for field in fields.values()])
-                fields.clear()
+        def add_fields_left():
+            group.extend((name,) for name in fields)
+            fields.clear()
 
-            def add_fields_left_hidden():
-                # This will allow rendering of hidden fields.
-                # Useful in case of subforms as formsets with custom
-                # layout when ALL_FIELDS is not used but we need to preserve
-                # hidden fields with IDs to save form properly.
-                hidden = [field for field in fields.values() if field.is_hidden]
-                if hidden:
-                    grouped['_hidden'] = hidden
-                fields.clear()
+        def pop_field(name: str) -> Optional[str]:
+            # Unknown names in multiple fields rows are tolerated.
+            if name in fields:
+                del fields[name]
+                return name
+            return None
 
-            for group_alias, rows in form_layout.items():
+        for group_alias, rows in form_layout.items():
 
-                group = grouped[group_alias]
+            group = []
 
-                if isinstance(rows, str):
-                    # Macros.
+            if isinstance(rows, str):
+                # Macros.
 
-                    if rows == ALL_FIELDS:
-                        # All the fields left as separate rows.
-                        add_fields_left()
+                if rows != ALL_FIELDS:
+                    raise ValueError(f'Unsupported group layout macros: {rows}')
 
-                    else:  # pragma: nocover
-                        raise ValueError(f'Unsupported group layout macros: {rows}')
+                # All the fields left as separate rows.
+                add_fields_left()
 
-                else:
+            else:
 
-                    for row in rows:
-                        if isinstance(row, str):
+                for row in rows:
+                    if isinstance(row, str):
 
-                            if row == ALL_FIELDS:
-                                # All the fields left as separate rows.
-                                add_fields_left()
-
-                            else:
-                                # One field in row.
-                                group.append([fields.pop(row)])
+                        if row == ALL_FIELDS:
+                            # All the fields left as separate rows.
+                            add_fields_left()
 
                         else:
-                            # Several fields in a row.
-                            row_items = []
-                            for row_item in row:
-                                if not isinstance(row_item, list):
-                                    row_item = [row_item]
-                                row_items.append([fields.pop(row_subitem, '') for row_subitem in row_item])
-                            group.append(row_items)
+                            # One field in row.
+                            if row not in fields:
+                                raise ValueError(
+                                    f'Unknown or already used field "{row}" '
+                                    f'in "{group_alias}" layout group of {cls.__name__}')
+
+                            del fields[row]
+                            group.append((row,))
+
+                    else:
+                        # Several fields in a row.
+                        row_items = []
+                        for row_item in row:
+                            if not isinstance(row_item, list):
+                                row_item = [row_item]
+                            row_items.append(tuple(pop_field(row_subitem) for row_subitem in row_item))
+                        group.append(tuple(row_items))
+
+            groups.append((group_alias, tuple(group)))
+
+        return None, tuple(groups), tuple(fields)
+
+    def _layout_get_plan(self) -> tuple:
+        # Plan depends only on composer layout and field names,
+        # so it is shared by forms of different classes (e.g. created per request).
+        field_names = tuple(self.form.fields)
+
+        plans = self._layout_plans
+        plan = plans.get(field_names)
+
+        if plan is None:
+
+            if len(plans) >= 512:
+                plans.clear()
+
+            plan = plans[field_names] = self._layout_compile(field_names)
+
+        return plan
+
+    def _layout_materialize(self, rows: tuple) -> list:
+        # Turns field names from a render plan into bound fields.
+        form = self.form
+
+        def materialize(item):
+            if item is None:
+                return ''
+            if isinstance(item, str):
+                return form[item]
+            return [materialize(subitem) for subitem in item]
+
+        return [materialize(row) for row in rows]
+
+    def _layout_get_group(self, alias: str) -> tuple:
+        # Returns group rows (with field names) from a render plan.
+        _, groups, _ = self._layout_get_plan()
+
+        for group_alias, rows in groups or ():
+            if group_alias == alias:
+                return rows
+
+        raise ValueError(f'Unknown layout group "{alias}" for {self.__class__.__name__}')
+
+    def get_group_fields(self, alias: str) -> List[str]:
+        """Returns names of fields in the given layout group.
+
+        :param alias: Group alias (see `layout[FORM]`).
+
+        """
+        names = []
+
+        def gather(item):
+            if item is None:
+                return
+            if isinstance(item, str):
+                names.append(item)
+                return
+            for subitem in item:
+                gather(subitem)
+
+        gather(self._layout_get_group(alias))
+
+        return names
+
+    def render_group(self, alias: str) -> str:
+        """Renders a single layout group (see `layout[FORM]`).
+        Only fields of the group are rendered.
+
+        Useful for partial page updates.
+
+        :param alias: Group alias.
+
+        """
+        rows = self._layout_materialize(self._layout_get_group(alias))
+        return ''.join(self._iter_group(alias, rows=rows))
+
+    def _render_group_deferred(self, alias: str) -> str:
+        form = self.form
+        target_url = form.target_url
+        query = urlencode({form.add_prefix(self.opt_deferred_param): alias})
+        url = f"{target_url}{'&' if '?' in target_url else '?'}{query}"
+        return f'<div data-siteforms-deferred="{escape(alias)}" data-url="{escape(url)}"></div>'
 
-            add_fields_left_hidden()
+    def get_deferred_alias(self) -> Optional[str]:
+        """Returns an alias of a deferred group (see `groups_deferred`)
+        requested by a client or None.
+
+        """
+        form = self.form
+        request = form.request
+
+        if request is None:
+            return None
+
+        alias = request.GET.get(form.add_prefix(self.opt_deferred_param))
+
+        if alias not in (self.groups_deferred or ()):
+            return None
+
+        return alias
+
+    def get_deferred_pending(self) -> List[str]:
+        """Returns aliases of deferred groups (see `groups_deferred`)
+        not loaded into a form by a client: all of them for a form
+        which is not submitted, and those without marker inputs
+        (see `opt_deferred_marker`) in data of a submitted one.
+
+        """
+        deferred = list(self.groups_deferred or ())
+        form = self.form
+
+        if not deferred or not form.is_submitted:
+            return deferred
+
+        data = form.data
+        name = form.add_prefix(self.opt_deferred_marker)
+        loaded = data.getlist(name) if hasattr(data, 'getlist') else [data.get(name)]
+
+        return [alias for alias in deferred if alias not in loaded]
+
+    def render_field(self, name: str) -> str:
+        """Renders a single field box (including label, hint and feedback).
+
+        Useful for partial page updates.
+
+        :param name: Field name.
+
+        """
+        return ''.join(self._iter_field_box(self.form[name]))
+
+    def render_errors(self, names: Iterable[str]) -> Dict[str, str]:
+        """Renders non-field feedback and boxes of the given fields
+        keyed by IDs of wrapping elements (see `opt_box_ids`).
+
+        :param names: Field names.
+
+        """
+        form = self.form
+
+        self._gather_feedback_hidden()
+
+        rendered = {self.get_box_id(): self._render_feedback_nonfield()}
+
+        for name in names:
+            field = form[name]
+
+            if field.is_hidden:
+                continue
+
+            rendered[self.get_box_id(field)] = ''.join(self._iter_field_box_contents(field))
+
+        return rendered
+
+    def _iter_layout(self) -> TypeChunks:
+        form = self.form
+        iter_field_box = self._iter_field_box
+
+        fields, groups, leftovers = self._layout_get_plan()
+
+        self._gather_feedback_hidden()
+
+        if self.opt_box_ids:
+            yield from self._iter_box(self.get_box_id(), [self._render_feedback_nonfield()])
+
+        else:
+            yield self._render_feedback_nonfield()
+
+        if fields is not None:
+            for name in fields:
+                yield self._sep
+                yield from iter_field_box(form[name])
+
+        else:
+            materialize = self._layout_materialize
+            deferred = self.get_deferred_pending()
+
+            grouped = {
+                # Deferred groups are not materialized.
+                group_alias: None if group_alias in deferred else materialize(rows)
+                for group_alias, rows in groups
+            }
+
+            # This will allow rendering of hidden fields.
+            # Useful in case of subforms as formsets with custom
+            # layout when ALL_FIELDS is not used but we need to preserve
+            # hidden fields with IDs to save form properly.
+            hidden = [field for field in (form[name] for name in leftovers) if field.is_hidden]
+            if hidden:
+                grouped['_hidden'] = hidden
+
+            iter_group = self._iter_group
 
             for group_alias, rows in grouped.items():
-                out.append(render_group(group_alias, rows=rows))
+                yield self._sep
 
-        out.insert(0, self._render_feedback_nonfield())
+                if rows is None:
+                    yield self._render_group_deferred(group_alias)
+                    continue
 
-        return '\n'.join(out)
+                yield from iter_group(group_alias, rows=rows)
+
+    def _render_layout(self) -> str:
+        return ''.join(self._iter_layout())
 
     def _render_submit(self) -> str:
         get_attr = self._attrs_get
@@ -543,41 +1359,140 @@ class FormComposer:
             )
         )
 
+    def _render_csrf(self) -> str:
+        form = self.form
+        request = form.request
+
+        if request and form.src == 'POST':  # do not leak csrf token for GET
+            return f'<input type="hidden" name="csrfmiddlewaretoken" value="{get_token(request)}">'
+
+        return ''
+
+    def render_iter(self, *, render_form_tag: bool = UNSET) -> TypeChunks:
+        """Renders form yielding HTML chunks. Subforms are rendered depth-first.
+
+        Useful to stream large forms, e.g. using StreamingHttpResponse.
+
+        :param render_form_tag: Can be used to override `opt_render_form_tag` class setting.
+
+        """
+        render_form_tag = self.opt_render_form_tag if render_form_tag is UNSET else render_form_tag
+
+        if not render_form_tag:
+            yield from self._iter_layout()
+            return
+
+        get_attr = partial(self._attrs_get, self.attrs)
+        form = self.form
+
+        form_id = form.id or ''
+        if form_id:
+            form_id = f' id="{form.id}"'
+
+        action = ''
+        target_url = form.target_url
+        if target_url:
+            action = f' action="{target_url}"'
+
+        yield f'<form{self._flatatt(get_attr(FORM))}{form_id}{action}>{self._render_csrf()}'
+        yield from self._iter_layout()
+        yield f'{self._render_submit()}</form>'
+
     def render(self, *, render_form_tag: bool = UNSET) -> str:
         """Renders form to string.
 
         :param render_form_tag: Can be used to override `opt_render_form_tag` class setting.
 
         """
-        html = self._render_layout()
+        return ''.join(self.render_iter(render_form_tag=render_form_tag))
 
-        render_form_tag = self.opt_render_form_tag if render_form_tag is UNSET else render_form_tag
+    async def arender(self, *, render_form_tag: bool = UNSET) -> str:
+        """Asynchronous version of render() for ASGI deployments.
 
-        if render_form_tag:
-            get_attr = partial(self._attrs_get, self.attrs)
-            form = self.form
+        Data required for rendering is prefetched using async ORM
+        (see SiteformsMixin.aprefetch()). Form fields attributes
+        (read-only, hidden, etc.) are applied as on form rendering.
 
-            form_id = form.id or ''
-            if form_id:
-                form_id = f' id="{form.id}"'
+        :param render_form_tag: Can be used to override `opt_render_form_tag` class setting.
 
-            request = form.request
+        """
+        form = self.form
 
-            csrf = ''
-            if request and form.src == 'POST':  # do not leak csrf token for GET
-                csrf = f'<input type="hidden" name="csrfmiddlewaretoken" value="{get_token(request)}">'
+        return await render_async(
+            prefetch=form.aprefetch,
+            render=lambda: form._apply_attrs(callback=lambda: self.render(render_form_tag=render_form_tag)),
+        )
 
-            action = ''
-            target_url = form.target_url
-            if target_url:
-                action = f' action="{target_url}"'
 
-            html = (
-                f'<form {flatatt(get_attr(FORM))}{form_id}{action}>'
-                f'{csrf}'
-                f'{html}'
-                f'{self._render_submit()}'
-                '</form>'
-            )
+def freeze_options(value: Any) -> Any:
+    """Returns a hashable representation of composer class attributes
+    (options, attrs, layout, etc.) to be used as a key for composer classes cache.
+
+    :param value:
+
+    """
+    if isinstance(value, dict):
+        return dict, tuple(sorted(
+            ((freeze_options(key), freeze_options(item)) for key, item in value.items()),
+            key=repr,
+        ))
+
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(freeze_options(item) for item in value)
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset, frozenset(freeze_options(item) for item in value)
+
+    return value
+
+
+def make_composer(
+        bases: Union[Type[TypeComposer], Tuple[Type[TypeComposer], ...]],
+        options: Dict[str, Any] = None,
+        *,
+        name: str = 'Composer',
+) -> Type[TypeComposer]:
+    """Returns a composer class for the given bases and class attributes.
+
+    Classes are interned: the same class is returned for the same
+    bases and attributes, so that it is not created over and over again
+    (e.g. on every request) and its compiled plans are reused.
+
+    Example::
+
+        composer = make_composer(Bootstrap5, {'opt_size': 'sm', 'groups': {'basic': 'Basic'}})
+
+    :param bases: Base composer class or a tuple of classes.
+    :param options: Class attributes (options, attrs, layout, etc.).
+    :param name: Class name.
+
+    """
+    if not isinstance(bases, tuple):
+        bases = (bases,)
+
+    options = options or {}
+
+    try:
+        key = (bases, freeze_options(options))
+        composer = _composers.get(key)
+
+    except TypeError:
+        # Unhashable values. Not interned.
+        return type(name, bases, dict(options))
+
+    if composer is None:
+
+        if len(_composers) >= _composers_max:
+            _composers.clear()
+
+        # Qualified name is made unique for the attributes,
+        # since it is used e.g. in render cache keys.
+        digest = md5(repr(key).encode()).hexdigest()[:10]
+
+        composer = _composers[key] = type(name, bases, {
+            **options,
+            '__qualname__': f'{name}_{digest}',
+            '_interned': True,
+        })
 
-        return html
+    return composer
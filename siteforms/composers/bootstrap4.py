@@ -3,9 +3,8 @@ from typing import Optional, Tuple, Union
 from django.forms import FileInput, ClearableFileInput, CheckboxInput, BoundField, Select, SelectMultiple
 
 from .base import (
-    FormComposer, TypeAttrs, ALL_FIELDS, FORM, ALL_GROUPS, ALL_ROWS, SUBMIT, FIELDS_STACKED, FIELDS_READONLY,
+    FormComposer, TypeAttrs, get_css_sizer, size_attrs, ALL_FIELDS, FORM, ALL_GROUPS, ALL_ROWS, SUBMIT, FIELDS_STACKED, FIELDS_READONLY,
 ) # noqa
-from ..utils import UNSET
 
 
 class Bootstrap4(FormComposer):
@@ -45,8 +44,21 @@ class Bootstrap4(FormComposer):
     opt_feedback_valid: bool = True
     """Whether to render feedback for valid fields."""
 
+    _opts_static: Tuple[str, ...] = ('opt_size', 'opt_custom_controls', 'opt_columns')
+
     _size_mod: Tuple[str, ...] = ('col-form-label', 'form-control', 'input-group')
     _file_cls = {'class': 'form-control-file'}
+    _css_feedback_stub = 'form-control is-invalid'
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+
+        # Sizing is resolved here once all the hooks have updated attributes.
+        # Sized parents may need their sizing to be replaced.
+        if any(getattr(base, 'opt_size', '') for base in cls.__mro__):
+            sizer = get_css_sizer(cls._size_mod, cls.opt_size)
+            size_attrs(cls, sizer)
+            cls._css_feedback_stub = sizer('form-control is-invalid')
 
     @classmethod
     def _hook_init_subclass(cls):
@@ -161,7 +173,7 @@ class Bootstrap4(FormComposer):
 
         if field.errors:
             # prepend hidden input to workaround feedback not shown for subforms
-            out = f'<input type="hidden" class="form-control is-invalid">{out}'
+            out = f'<input type="hidden" class="{self._css_feedback_stub}">{out}'
 
         return out
 
@@ -182,31 +194,6 @@ class Bootstrap4(FormComposer):
 
         return super()._render_field(field, attrs)
 
-    def render(self, *, render_form_tag: bool = UNSET) -> str:
-        out = super().render(render_form_tag=render_form_tag)
-
-        size = self.opt_size
-
-        if size:
-            # Apply sizing.
-            mod = f'-{size}'
-
-            # Workaround form-control- prefix clashes.
-            clashing = {}
-            for idx, term in enumerate(('form-control-file', 'form-control-plaintext')):
-                tmp_key = f'tmp_{idx}'
-                clashing[tmp_key] = term
-                out = out.replace(term, tmp_key)
-
-            for val in self._size_mod:
-                out = out.replace(val, f'{val} {val}{mod}')
-
-            # Roll off the workaround.
-            for tmp_key, term in clashing.items():
-                out = out.replace(tmp_key, term)
-
-        return out
-
     attrs: TypeAttrs = {
         FORM: {'class': _get_attr_form},
         SUBMIT: {'class': 'btn btn-primary mt-3'},  # todo control-group?
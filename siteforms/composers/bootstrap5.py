@@ -2,9 +2,8 @@ from typing import Tuple, Union
 
 from django.forms import CheckboxInput, BoundField, Select, SelectMultiple
 
-from .base import FormComposer, TypeAttrs, ALL_FIELDS, FORM, ALL_ROWS, SUBMIT, FIELDS_READONLY
+from .base import FormComposer, TypeAttrs, get_css_sizer, size_attrs, ALL_FIELDS, FORM, ALL_ROWS, SUBMIT, FIELDS_READONLY
 from ..fields import SubformField
-from ..utils import UNSET
 
 
 class Bootstrap5(FormComposer):
@@ -46,8 +45,19 @@ class Bootstrap5(FormComposer):
 
     opt_tag_help: str = 'div'
 
+    _opts_static: Tuple[str, ...] = ('opt_size', 'opt_columns', 'opt_form_inline')
+
     _size_mod: Tuple[str, ...] = ('col-form-label', 'form-control', 'form-select', 'btn')
 
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+
+        # Sizing is resolved here once all the hooks have updated attributes.
+        # Sized parents may need their sizing to be replaced.
+        if any(getattr(base, 'opt_size', '') for base in cls.__mro__):
+            sizer = get_css_sizer(cls._size_mod, cls.opt_size)
+            size_attrs(cls, sizer)
+
     @classmethod
     def _hook_init_subclass(cls):
         super()._hook_init_subclass()
@@ -148,31 +158,6 @@ class Bootstrap5(FormComposer):
 
         return super()._render_field(field, attrs)
 
-    def render(self, *, render_form_tag: bool = UNSET) -> str:
-        out = super().render(render_form_tag=render_form_tag)
-
-        size = self.opt_size
-
-        if size:
-            # Apply sizing.
-            mod = f'-{size}'
-
-            # Workaround form-control- prefix clashes.
-            clashing = {}
-            for idx, term in enumerate(('form-control-plaintext', 'btn-')):
-                tmp_key = f'tmp_{idx}'
-                clashing[tmp_key] = term
-                out = out.replace(term, tmp_key)
-
-            for val in self._size_mod:
-                out = out.replace(val, f'{val} {val}{mod}')
-
-            # Roll off the workaround.
-            for tmp_key, term in clashing.items():
-                out = out.replace(tmp_key, term)
-
-        return out
-
     attrs: TypeAttrs = {
         SUBMIT: {'class': 'btn btn-primary mt-3'},
         ALL_FIELDS: {'class': 'form-control'},
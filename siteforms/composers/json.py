@@ -0,0 +1,270 @@
+import json
+from typing import Dict, Any, List
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms import BoundField, BaseFormSet
+from django.middleware.csrf import get_token
+from django.utils.translation import get_language
+
+from .base import FormComposer, TypeChunks, FORM
+from ..utils import UNSET
+from ..widgets import ReadOnlyWidget, SubformWidget
+
+if False:  # pragma: nocover
+    from ..base import SiteformsMixin  # noqa
+
+TypeDescriptor = Dict[str, Any]
+
+
+class DescriptorEncoder(DjangoJSONEncoder):
+    """Encodes values unknown to JSON (e.g. files) as strings."""
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return f'{o}'
+
+
+class JSONComposer(FormComposer):
+    """Composes a machine-readable (JSON) form descriptor
+    instead of HTML, e.g. for client-side rendering.
+
+    Descriptor includes fields (with widget types, attributes, choices,
+    values and errors), layout tree (groups with rows, where a row is a list
+    of columns and a column is a list of stacked fields), non-field errors,
+    subforms and formsets.
+
+    """
+
+    opt_cache_static: bool = True
+    """Cache static descriptor parts (labels, hints, choices, layout tree)
+    per form class and language.
+
+    .. note:: Switch off if labels, hints or choices of your forms are set per form instance.
+
+    """
+
+    _static: Dict[tuple, TypeDescriptor] = {}
+    """Static descriptor parts cache. Populated on first use."""
+
+    _static_max: int = 512
+
+    @classmethod
+    def _hook_init_subclass(cls):
+        super()._hook_init_subclass()
+        cls._static = {}
+
+    def _describe_choices(self, choices) -> List[list]:
+        described = []
+
+        for value, label in choices:
+
+            if isinstance(label, (list, tuple)):
+                described.append([value, self._describe_choices(label)])
+                continue
+
+            described.append([getattr(value, 'value', value), f'{label}'])
+
+        return described
+
+    def _describe_rows(self, rows) -> list:
+
+        def describe(item):
+            if item is None or isinstance(item, str):
+                return item
+            return [describe(subitem) for subitem in item]
+
+        return [describe(row) for row in rows]
+
+    def _describe_static(self) -> TypeDescriptor:
+        form = self.form
+        groups = self.groups
+        fields, layout_groups, leftovers = self._layout_get_plan()
+
+        if fields is None:
+            layout = [
+                {
+                    'group': alias,
+                    'title': f"{groups.get(alias, '')}",
+                    'rows': self._describe_rows(rows),
+                }
+                for alias, rows in layout_groups
+            ]
+
+        else:
+            layout = list(fields)
+
+        described_fields = {}
+
+        for name in form.fields:
+            field = form[name]
+            choices = getattr(field.field, 'choices', None)
+
+            described = {
+                'name': field.html_name,
+                'id': field.auto_id,
+                'label': f'{field.label}',
+                'help': f'{field.help_text}',
+                'required': field.field.required,
+            }
+
+            # Choices from querysets are described on every render.
+            if isinstance(choices, (list, tuple)):
+                described['choices'] = self._describe_choices(choices)
+
+            described_fields[name] = described
+
+        return {
+            'fields': described_fields,
+            'layout': layout,
+        }
+
+    def _get_static(self) -> TypeDescriptor:
+        if not self.opt_cache_static:
+            return self._describe_static()
+
+        form = self.form
+        key = (form.__class__, get_language(), form.prefix, form.auto_id, tuple(form.fields))
+
+        cache = self._static
+        static = cache.get(key)
+
+        if static is None:
+
+            if len(cache) >= self._static_max:
+                cache.clear()
+
+            static = cache[key] = self._describe_static()
+
+        return static
+
+    def _describe_subform(self, field: BoundField) -> TypeDescriptor:
+        subform = field.form.get_subform(name=field.html_name)
+
+        def describe(form: 'SiteformsMixin') -> TypeDescriptor:
+            composer = form.get_composer()
+
+            if not isinstance(composer, JSONComposer):
+                composer = self.__class__(form)
+
+            return form._apply_attrs(callback=lambda: composer.describe(render_form_tag=False))
+
+        if isinstance(subform, BaseFormSet):
+            management = subform.management_form
+            return {
+                'management': {
+                    management[name].html_name: management[name].value()
+                    for name in management.fields
+                },
+                'forms': [describe(form) for form in subform],
+            }
+
+        return describe(subform)
+
+    def _describe_field(self, field: BoundField, static: TypeDescriptor) -> TypeDescriptor:
+        base_field = field.field
+        widget = base_field.widget
+        submitted = self.form.is_submitted
+
+        described = {
+            **static,
+            'widget': widget.__class__.__name__,
+            'input_type': getattr(widget, 'input_type', None),
+            'hidden': field.is_hidden,
+            'disabled': base_field.disabled,
+            'readonly': isinstance(widget, ReadOnlyWidget),
+            'attrs': self._attrs_get_basic(self.attrs, field),
+            'errors': [f'{error}' for error in field.errors] if submitted else [],
+        }
+
+        if isinstance(widget, SubformWidget):
+            described['subform'] = self._describe_subform(field)
+            return described
+
+        value = field.value()
+        described['value'] = value
+
+        if described['readonly']:
+            widget.bound_field = field
+            described['display'] = widget.format_value(value)
+
+        elif 'choices' not in static and hasattr(base_field, 'choices') and not field.is_hidden:
+            described['choices'] = self._describe_choices(base_field.choices)
+
+        return described
+
+    def describe(self, *, render_form_tag: bool = UNSET) -> TypeDescriptor:
+        """Returns form descriptor.
+
+        :param render_form_tag: Whether to describe form tag attributes
+            (method, action, CSRF token, submit button).
+            Can be used to override `opt_render_form_tag` class setting.
+
+        """
+        render_form_tag = self.opt_render_form_tag if render_form_tag is UNSET else render_form_tag
+
+        form = self.form
+        static = self._get_static()
+        static_fields = static['fields']
+
+        _, groups, leftovers = self._layout_get_plan()
+
+        deferred = set()
+        if groups:
+            pending = self.get_deferred_pending()
+            deferred = {alias for alias, _ in groups if alias in pending}
+
+        names = set(form.fields)
+
+        for alias, rows in groups or ():
+            if alias in deferred:
+                names.difference_update(self.get_group_fields(alias))
+
+        names.difference_update(name for name in leftovers if not form[name].is_hidden)
+
+        self._gather_feedback_hidden()
+
+        described: TypeDescriptor = {
+            'id': form.id or None,
+            'prefix': form.prefix,
+            'errors': [f'{error}' for error in form.non_field_errors()],
+            'fields': {
+                name: self._describe_field(form[name], static_fields[name])
+                for name in form.fields if name in names
+            },
+            'layout': static['layout'],
+            'deferred': sorted(deferred),
+        }
+
+        if render_form_tag:
+            get_attr = self._attrs_get
+            request = form.request
+            csrf = None
+
+            if request and form.src == 'POST':
+                csrf = get_token(request)
+
+            described['form'] = {
+                'attrs': {
+                    **get_attr(self.attrs, FORM),
+                    **({'action': form.target_url} if form.target_url else {}),
+                },
+                'csrf': csrf,
+                'submit': {
+                    'name': self.opt_submit_name,
+                    'value': form.submit_marker,
+                    'title': f'{self.opt_submit}',
+                },
+            }
+
+        return described
+
+    def render_iter(self, *, render_form_tag: bool = UNSET) -> TypeChunks:
+        """Renders form descriptor as JSON.
+
+        :param render_form_tag: Can be used to override `opt_render_form_tag` class setting.
+
+        """
+        yield json.dumps(self.describe(render_form_tag=render_form_tag), cls=DescriptorEncoder)
+
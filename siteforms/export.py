@@ -0,0 +1,327 @@
+import json
+import re
+from typing import Type, Union, List, Tuple, Dict, Any, Optional
+
+from django.forms import BoundField
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe, SafeString
+
+from .composers.base import TypeAttrs, TypeChunks, make_composer
+from .widgets import SubformWidget
+
+if False:  # pragma: nocover
+    from .base import SiteformsMixin  # noqa
+
+
+ENGINE_DJANGO = 'django'
+ENGINE_JINJA2 = 'jinja2'
+
+ENGINES = (ENGINE_DJANGO, ENGINE_JINJA2)
+
+TypeMarker = Tuple[Any, ...]
+TypeMarked = Tuple[TypeMarker, ...]
+
+PREFIX_PLACEHOLDER = '__prefix__'
+"""Formset empty form prefix placeholder."""
+
+RE_MARKER = re.compile('\x00export(\\d+)\x00')
+RE_SYNTAX = re.compile(r'{[%{#]|[%}#]}')
+
+SYNTAX_DJANGO = {
+    '{%': '{% templatetag openblock %}',
+    '%}': '{% templatetag closeblock %}',
+    '{{': '{% templatetag openvariable %}',
+    '}}': '{% templatetag closevariable %}',
+    '{#': '{% templatetag opencomment %}',
+    '#}': '{% templatetag closecomment %}',
+}
+
+
+class ExportComposerMixin:
+    """Composer mixin used to export a form layout as a template.
+    Renders markers in place of widgets, feedback and CSRF token.
+
+    .. note:: This is not a FormComposer subclass on purpose, so that
+        attributes enrichment doesn't bring in base composer wrappers and layout
+        over the ones of a composer being exported.
+
+    """
+
+    def __init__(self, form: 'SiteformsMixin', **kwargs):
+        super().__init__(form, **kwargs)
+        self.export_markers: List[TypeMarker] = []
+        # Debug annotations are not to be baked into templates.
+        self._debug = False
+
+    def _mark(self, *marker: str) -> str:
+        markers = self.export_markers
+        markers.append(marker)
+        return f'\x00export{len(markers) - 1}\x00'
+
+    def _render_csrf(self) -> str:
+        return self._mark('csrf')
+
+    def _render_widget(self, field: BoundField, attrs: TypeAttrs) -> str:
+        return self._mark('widget', field.name, attrs)
+
+    def _render_feedback(self, field: BoundField) -> str:
+        return self._mark('feedback', field.name)
+
+    def _render_feedback_nonfield(self) -> str:
+        return self._mark('nonfield')
+
+    def _compose_field_box(self, field: BoundField) -> str:
+        if field.is_hidden:
+            return self._mark('hidden', field.name)
+        return super()._compose_field_box(field)
+
+
+class ExportedForm:
+    """Exported template helper. Available in exported templates context as `siteforms`.
+    Renders form parts which depend on form state: widgets, feedback, CSRF.
+
+    """
+
+    def __init__(self, form: 'SiteformsMixin'):
+        self.form = form
+        self.composer = form.get_composer()
+
+    @property
+    def csrf(self) -> bool:
+        """Whether CSRF token should be rendered."""
+        form = self.form
+        return bool(form.request and form.src == 'POST')
+
+    def widget(self, name: str, attrs: Union[str, TypeAttrs] = None) -> SafeString:
+        """Renders a widget for the given field.
+
+        :param name: Field name.
+        :param attrs: Widget attributes dictionary or JSON (see dump_attrs()).
+            If not set, field is rendered as is (e.g. hidden fields).
+
+        """
+        form = self.form
+        field = form[name]
+
+        if attrs is None:
+            return mark_safe(f'{field}')
+
+        if isinstance(field.field.widget, SubformWidget):
+            return mark_safe(form.get_subform(name=field.html_name).render())
+
+        if isinstance(attrs, str):
+            attrs = json.loads(attrs)
+
+        return mark_safe(self.composer._render_field(field, attrs))
+
+    def feedback(self, name: str = None) -> SafeString:
+        """Renders feedback (errors) for the given field.
+        If field name is not set, non-field feedback is rendered.
+
+        :param name: Field name.
+
+        """
+        composer = self.composer
+
+        if name is None:
+            composer._gather_feedback_hidden()
+            return mark_safe(composer._render_feedback_nonfield())
+
+        return mark_safe(composer._render_feedback(self.form[name]))
+
+
+def dump_attrs(attrs: Optional[TypeAttrs]) -> str:
+    """Dumps widget attributes into JSON safe to be put into template tags.
+
+    :param attrs:
+
+    """
+    def dump(value: Any) -> str:
+        if not isinstance(value, (bool, int, float)) and value is not None:
+            value = f'{value}'
+        return json.dumps(value).replace('{', '\\u007b').replace('}', '\\u007d').replace('%', '\\u0025')
+
+    items = ', '.join(f'{dump(key)}: {dump(value)}' for key, value in (attrs or {}).items())
+
+    return f'{{{items}}}'
+
+
+def quote(value: str) -> str:
+    """Quotes a string to be used as a literal in templates."""
+    value = value.replace('\\', '\\\\').replace("'", "\\'")
+    return f"'{value}'"
+
+
+def escape_syntax(text: str, *, engine: str) -> str:
+    """Escapes template engine syntax in a static text.
+
+    :param text:
+    :param engine:
+
+    """
+    if engine == ENGINE_DJANGO:
+        replace = SYNTAX_DJANGO.__getitem__
+
+    else:
+        def replace(token: str) -> str:
+            return f"{{{{ '{token}' }}}}"
+
+    return RE_SYNTAX.sub(lambda match: replace(match.group(0)), text)
+
+
+def render_marker(marker: TypeMarker, *, engine: str) -> str:
+    """Renders template code for the given marker.
+
+    :param marker:
+    :param engine:
+
+    """
+    kind, *args = marker
+
+    if kind == 'csrf':
+        if engine == ENGINE_DJANGO:
+            return '{% if siteforms.csrf %}{% csrf_token %}{% endif %}'
+        return '{% if siteforms.csrf %}{{ csrf_input }}{% endif %}'
+
+    method = {
+        'widget': 'widget',
+        'hidden': 'widget',
+        'feedback': 'feedback',
+        'nonfield': 'feedback',
+    }[kind]
+
+    if kind == 'widget':
+        args[1] = dump_attrs(args[1])
+
+    args = [quote(arg) for arg in args]
+
+    if engine == ENGINE_DJANGO:
+        return f"{{% siteforms_{method} {' '.join(['siteforms', *args])} %}}"
+
+    return f"{{{{ siteforms.{method}({', '.join(args)}) }}}}"
+
+
+def get_marked(form: 'SiteformsMixin') -> TypeMarked:
+    """Renders the given form into a sequence of static HTML chunks
+    (represented by 'static' markers) and markers for widgets,
+    feedback and CSRF token.
+
+    :param form:
+
+    """
+    composer_cls = form.get_composer().__class__
+    composer = make_composer(
+        (ExportComposerMixin, composer_cls),
+        name=f'Export{composer_cls.__name__}',
+    )(form, options=form.composer_options)
+
+    rendered = form._apply_attrs(
+        callback=lambda: composer.render(render_form_tag=form.composer_render_form_tag))
+
+    markers = composer.export_markers
+    marked = []
+
+    for idx, chunk in enumerate(RE_MARKER.split(rendered)):
+
+        if idx % 2:
+            marked.append(markers[int(chunk)])
+
+        elif chunk:
+            marked.append(('static', chunk))
+
+    return tuple(marked)
+
+
+def export_template(form_cls: Type['SiteformsMixin'], *, engine: str = ENGINE_DJANGO, **form_kwargs) -> str:
+    """Exports form layout as a template.
+
+    Layout, wrappers, labels, hints and attributes are baked into the template,
+    while widgets (with values), feedback (errors) and CSRF token are rendered
+    by template tags. Use render_exported() to render a form using the template.
+
+    :param form_cls: Form class to export.
+    :param engine: Template engine: django, jinja2.
+    :param form_kwargs: Keyword arguments to initialize a form with
+        (e.g. src, id, target_url, prefix, hidden_fields). Forms rendered
+        with the template are expected to be initialized with the same arguments.
+
+    """
+    if engine not in ENGINES:
+        raise ValueError(f'Unsupported template engine: {engine}. Use one of: {", ".join(ENGINES)}')
+
+    out = ['{% load siteforms %}' if engine == ENGINE_DJANGO else '']
+
+    for marker in get_marked(form_cls(**form_kwargs)):
+
+        if marker[0] == 'static':
+            out.append(escape_syntax(marker[1], engine=engine))
+
+        else:
+            out.append(render_marker(marker, engine=engine))
+
+    return ''.join(out)
+
+
+def render_stencil(marked: TypeMarked, form: 'SiteformsMixin', *, index: str) -> TypeChunks:
+    """Renders the given form using markers compiled for a formset empty form
+    (see get_marked()), substituting `__prefix__` with the given index.
+
+    :param marked: Markers compiled for a formset empty form.
+    :param form: Formset form to render.
+    :param index: Form index in a formset.
+
+    """
+    exported = ExportedForm(form)
+    composer = exported.composer
+
+    def substitute(value):
+        return value.replace(PREFIX_PLACEHOLDER, index) if isinstance(value, str) else value
+
+    with form._attrs_applied():
+
+        for kind, *args in marked:
+
+            if kind == 'static':
+                yield args[0].replace(PREFIX_PLACEHOLDER, index)
+
+            elif kind == 'widget':
+                name, attrs = args
+                field = form[name]
+
+                if isinstance(field.field.widget, SubformWidget):
+                    yield from form.get_subform(name=field.html_name).iter_render()
+
+                else:
+                    yield exported.widget(name, {key: substitute(value) for key, value in attrs.items()})
+
+            elif kind == 'hidden':
+                yield exported.widget(args[0])
+
+            elif kind == 'feedback':
+                yield exported.feedback(args[0])
+
+            elif kind == 'nonfield':
+                yield exported.feedback()
+
+            else:  # csrf
+                yield composer._render_csrf()
+
+
+def render_exported(form: 'SiteformsMixin', template: Union[str, Any], *, using: str = None) -> SafeString:
+    """Renders the given form using an exported template (see export_template()).
+
+    :param form: Form to render.
+    :param template: Template name or template object.
+    :param using: Template engine alias to load a template by name.
+
+    """
+    if isinstance(template, str):
+        template = get_template(template, using=using)
+
+    context: Dict[str, Any] = {
+        'form': form,
+        'siteforms': ExportedForm(form),
+    }
+
+    return mark_safe(form._apply_attrs(
+        callback=lambda: template.render(context, request=form.request)))
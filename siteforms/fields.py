@@ -1,4 +1,5 @@
 import json
+from copy import copy
 from typing import Optional
 
 from django.core.serializers.json import DjangoJSONEncoder
@@ -15,7 +16,15 @@ class EnhancedBoundField(BoundField):
     """This custom bound field allows widgets to access the field itself."""
 
     def as_widget(self, widget=None, attrs=None, only_initial=False):
-        widget = widget or self.field.widget
+
+        if widget is None:
+            # Form fields (and their widgets) belong to a form instance.
+            widget = self.field.widget
+
+        else:
+            # A widget passed in might be shared.
+            widget = copy(widget)
+
         widget.bound_field = self
         return super().as_widget(widget, attrs, only_initial)
 
@@ -73,7 +82,8 @@ class SubformField(EnhancedField):
                         # item id here is actually a model instance
                         value_.append(item['id'].id)
 
-                value = value_
+                # Keep items outside of a formset window (see `window_size`).
+                value = value_ + form.get_window_outside()
 
             else:
                 # For a subform with a model (FK).
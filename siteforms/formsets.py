@@ -1,13 +1,116 @@
-from django.forms import BaseFormSet, BaseModelFormSet
+import asyncio
+from math import ceil
+from typing import Generator, Dict, Optional, Tuple, List, Any
 
-from .utils import bind_subform
+from django.forms import BaseFormSet, BaseModelFormSet, HiddenInput
+from django.utils.translation import get_language
+
+from .export import TypeMarked, get_marked, render_stencil
+from .utils import bind_subform, render_async, check_async_support
+
+TypeStencil = Tuple[Tuple[str, ...], TypeMarked]
+
+WINDOW_PAGE = 'PAGE'
+"""Name (without a prefix) for a window page number parameter of formsets."""
 
 
 class SiteformFormSetMixin(BaseFormSet):
     """Custom formset to allow fields rendering subform to have multiple forms."""
 
+    _stencils: Dict[tuple, TypeStencil] = {}
+    _stencils_max: int = 512
+
     def render(self, *args, **kwargs):
-        return f'{self.management_form}' + ('\n'.join(form.render() for form in self))
+        return ''.join(self.iter_render())
+
+    def iter_render(self) -> Generator[str, None, None]:
+        """Renders this formset yielding HTML chunks."""
+        yield self._render_management()
+
+        stencil = self._get_stencil()
+        forms = self.forms
+        sep = '' if forms and forms[0].get_composer_option('opt_minify') else '\n'
+
+        for idx, form in enumerate(self):
+            if idx:
+                yield sep
+
+            if stencil and form.prefix == self.add_prefix(idx) and tuple(form.fields) == stencil[0]:
+                yield from render_stencil(stencil[1], form, index=f'{idx}')
+
+            else:
+                yield from form.iter_render()
+
+    async def arender(self) -> str:
+        """Asynchronous version of render() for ASGI deployments.
+        See SiteformsMixin.arender().
+
+        """
+        return await render_async(prefetch=self.aprefetch, render=self.render)
+
+    async def aprefetch(self):
+        """Loads data required to render this formset using async ORM.
+        See SiteformsMixin.aprefetch().
+
+        """
+        check_async_support()
+        await self._aprefetch(choices={})
+
+    async def _aprefetch(self, *, choices: dict):
+        await asyncio.gather(*(form._aprefetch(choices=choices) for form in self.forms))
+
+    def _render_management(self) -> str:
+        return f'{self.management_form}'
+
+    def _get_stencil(self) -> Optional[TypeStencil]:
+        # Forms in a formset share labels, hints, wrappers and attributes
+        # and differ only by prefixes, values and errors, so we render
+        # an empty form into a stencil once and reuse it for all forms.
+        forms = self.forms
+
+        if not forms or 'prefix' in self.form_kwargs:
+            return None
+
+        form = forms[0]
+
+        if getattr(form, 'Composer', None) is None or not form.get_composer_option('opt_formset_stencil'):
+            return None
+
+        if form.get_composer()._debug:
+            # Forms are annotated individually.
+            return None
+
+        key = (
+            self.__class__,
+            self.prefix,
+            self.auto_id,
+            get_language(),
+            form.src,
+            form.composer_render_form_tag,
+            form.id,
+            form.target_url,
+            form.submit_marker,
+            repr(form.hidden_fields),
+            repr(form.disabled_fields),
+            repr(form.readonly_fields),
+            repr(form.composer_options),
+        )
+
+        stencils = self._stencils
+        stencil = stencils.get(key)
+
+        if stencil is None:
+
+            if len(stencils) >= self._stencils_max:
+                stencils.clear()
+
+            empty_form = self.empty_form
+            # Submission state (e.g. validity CSS classes) is rendered for every form
+            # on its own, so it must not be baked into a stencil.
+            empty_form.is_submitted = False
+            stencil = stencils[key] = (tuple(empty_form.fields), get_marked(empty_form))
+
+        return stencil
 
     def _construct_form(self, i, **kwargs):
         form = super()._construct_form(i, **kwargs)
@@ -22,3 +125,93 @@ class SiteformFormSetMixin(BaseFormSet):
 
 class ModelFormSet(SiteformFormSetMixin, BaseModelFormSet):
     """Formset for model forms."""
+
+    def __init__(self, *args, window_size: int = 0, window_page: int = 1, **kwargs):
+        """
+
+        :param args:
+
+        :param window_size: If set, only a window (page) of this size
+            from the queryset is rendered and validated.
+
+        :param window_page: Window (page) number to use, starting from 1.
+
+        :param kwargs:
+
+        """
+        self.window_size = window_size
+        self.window_page = window_page
+        self.window_pages = 1
+        super().__init__(*args, **kwargs)
+
+    def get_queryset(self):
+        window_size = self.window_size
+
+        if not window_size or hasattr(self, '_queryset'):
+            return super().get_queryset()
+
+        queryset = super().get_queryset()
+        self._set_window(queryset, count=queryset.count())
+
+        return self._queryset
+
+    def _set_window(self, queryset, *, count: int):
+        window_size = self.window_size
+
+        pages = max(ceil(count / window_size), 1)
+        page = min(max(self.window_page, 1), pages)
+
+        self.window_pages = pages
+        self.window_page = page
+
+        offset = (page - 1) * window_size
+        self._queryset = queryset[offset:offset + window_size]
+
+    async def _aprefetch(self, *, choices: dict):
+
+        if not hasattr(self, '_queryset'):
+            queryset = super().get_queryset()
+
+            if self.window_size:
+                self._set_window(queryset, count=await queryset.acount())
+
+        async for _ in self.get_queryset():  # Populates queryset cache.
+            break
+
+        await super()._aprefetch(choices=choices)
+
+    def get_window_outside(self) -> List[Any]:
+        """Returns primary keys of queryset items outside the current window."""
+        if not self.window_size:
+            return []
+
+        window = self.get_queryset()
+        queryset = self.queryset
+
+        if queryset is None:
+            queryset = self.model._default_manager.get_queryset()
+
+        return list(queryset.exclude(pk__in=[item.pk for item in window]).values_list('pk', flat=True))
+
+    def _render_management(self) -> str:
+        management = super()._render_management()
+
+        if not self.window_size:
+            return management
+
+        self.get_queryset()  # Initialize window.
+        name = self.add_prefix(WINDOW_PAGE)
+
+        # Mimics BoundField.auto_id.
+        auto_id = self.auto_id
+        attrs = {}
+
+        if auto_id and '%s' in str(auto_id):
+            attrs['id'] = auto_id % name
+
+        elif auto_id:
+            attrs['id'] = name
+
+        widget = HiddenInput().render(name, self.window_page, attrs=attrs)
+
+        return f'{management}{widget}'
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from ...export import export_template, ENGINES, ENGINE_DJANGO
+
+
+class Command(BaseCommand):
+
+    help = 'Exports form layout as a Django or Jinja2 template.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('form', help='Dotted path to a form class. E.g.: myapp.forms.MyForm')
+        parser.add_argument('--engine', default=ENGINE_DJANGO, choices=ENGINES, help='Template engine.')
+        parser.add_argument('--src', default=None, help='Form data source. E.g.: POST, GET.')
+        parser.add_argument('--id', default='', help='Form ID.')
+        parser.add_argument('--target-url', default='', help='Form target URL.')
+        parser.add_argument('--prefix', default=None, help='Form prefix.')
+        parser.add_argument('--output', default='', help='File to write template into. Default: stdout.')
+
+    def handle(self, *args, **options):
+
+        try:
+            form_cls = import_string(options['form'])
+
+        except ImportError as e:
+            raise CommandError(f'Unable to import form class: {e}')
+
+        exported = export_template(
+            form_cls,
+            engine=options['engine'],
+            src=options['src'],
+            id=options['id'],
+            target_url=options['target_url'],
+            prefix=options['prefix'],
+        )
+
+        output = options['output']
+
+        if output:
+            with open(output, 'w') as f:
+                f.write(exported)
+
+        else:
+            self.stdout.write(exported, ending='')
@@ -0,0 +1,400 @@
+from functools import lru_cache
+from html import escape as html_escape
+from typing import Callable, Dict, Type, Any, Optional, Iterable, NamedTuple, Tuple, List
+
+from django.forms import (
+    BoundField, Widget,
+    TextInput, NumberInput, EmailInput, URLInput, PasswordInput, HiddenInput,
+    Textarea, CheckboxInput, Select, SelectMultiple,
+    Field, BooleanField, ModelChoiceField, ModelMultipleChoiceField,
+)
+from django.forms.renderers import DjangoTemplates
+from django.utils.formats import localize
+from django.utils.html import escape, conditional_escape
+from django.utils.safestring import SafeData, mark_safe
+from django.utils.timezone import template_localtime
+from django.utils.translation import get_language, gettext_lazy as _
+
+from .utils import UNSET
+from .widgets import ReadOnlyWidget
+
+TypeAttrsRaw = Dict[str, Any]
+TypeNativeRenderer = Callable[[Widget, str, Any, TypeAttrsRaw], str]
+TypeReadonlyFormatter = Callable[[BoundField, ReadOnlyWidget, Any], Any]
+
+
+def esc_format(value: Any) -> str:
+    """Mimics {{ value|stringformat:'s' }} with autoescaping on."""
+    if isinstance(value, SafeData):
+        return f'{value}'
+    return escape(f'{value}')
+
+
+def esc_var(value: Any) -> str:
+    """Mimics {{ value }} with autoescaping on."""
+    value = localize(template_localtime(value))
+    if not issubclass(type(value), str):
+        value = str(value)
+    return conditional_escape(value)
+
+
+def render_attrs(attrs: TypeAttrsRaw) -> str:
+    """Mimics django/forms/widgets/attrs.html"""
+    chunks = []
+
+    for name, value in attrs.items():
+
+        if value is False:
+            continue
+
+        if value is True:
+            chunks.append(f' {escape(name)}')
+
+        else:
+            chunks.append(f' {escape(name)}="{esc_format(value)}"')
+
+    return ''.join(chunks)
+
+
+def render_flatatt(attrs: TypeAttrsRaw) -> str:
+    """Mimics django.forms.utils.flatatt() without format_html() overhead."""
+    chunks = []
+    booleans = []
+
+    def esc(value: Any) -> str:
+        # Mimics conditional_escape().
+        if hasattr(value, '__html__'):
+            return value.__html__()
+        return html_escape(f'{value}')
+
+    for name, value in sorted(attrs.items(), key=lambda item: item[0]):
+
+        if isinstance(value, bool):
+            if value:
+                booleans.append(f' {esc(name)}')
+
+        elif value is not None:
+            chunks.append(f' {esc(name)}="{esc(value)}"')
+
+    return ''.join(chunks + booleans)
+
+
+def render_input(widget: Widget, name: str, value: Any, attrs: TypeAttrsRaw) -> str:
+    value = widget.format_value(value)
+    value = '' if value is None else f' value="{esc_format(value)}"'
+    attrs = render_attrs(widget.build_attrs(widget.attrs, attrs))
+    return f'<input type="{escape(widget.input_type)}" name="{escape(name)}"{value}{attrs}>'
+
+
+def render_password(widget: PasswordInput, name: str, value: Any, attrs: TypeAttrsRaw) -> str:
+    if not widget.render_value:
+        value = None
+    return render_input(widget, name, value, attrs)
+
+
+def render_checkbox(widget: CheckboxInput, name: str, value: Any, attrs: TypeAttrsRaw) -> str:
+    if widget.check_test(value):
+        attrs = {**attrs, 'checked': True}
+    return render_input(widget, name, value, attrs)
+
+
+def render_textarea(widget: Widget, name: str, value: Any, attrs: TypeAttrsRaw) -> str:
+    value = widget.format_value(value)
+    attrs = render_attrs(widget.build_attrs(widget.attrs, attrs))
+    return f'<textarea name="{escape(name)}"{attrs}>\n{esc_var(value) if value else ""}</textarea>'
+
+
+def freeze_choices(choices: Iterable) -> tuple:
+    """Returns a hashable representation of choices
+    to be used as a key for options cache.
+
+    Values types are preserved, so that e.g. 1 and True
+    or a str and a safe str are not considered equal.
+
+    :param choices:
+
+    """
+    frozen = []
+
+    for option_value, option_label in choices:
+
+        if isinstance(option_label, (list, tuple)):
+            option_label = tuple(
+                (type(subvalue), subvalue, type(sublabel), sublabel)
+                for subvalue, sublabel in option_label
+            )
+
+        frozen.append((type(option_value), option_value, type(option_label), option_label))
+
+    return tuple(frozen)
+
+
+class OptionsCompiled(NamedTuple):
+
+    html: str
+    """Options HTML with nothing selected."""
+
+    chunks: Tuple[str, ...]
+    """Options and optgroups HTML chunks."""
+
+    selectable: Dict[int, Tuple[str, str]]
+    """Chunk index to option HTML split at the position of `selected` attribute."""
+
+    positions: Dict[str, Tuple[int, ...]]
+    """Option value to chunks indexes."""
+
+
+@lru_cache(maxsize=256)
+def compile_options(frozen: tuple, language: str) -> OptionsCompiled:
+    """Compiles escaped options HTML. Mimics options part of django/forms/widgets/select.html
+    (see ChoiceWidget.optgroups()).
+
+    :param frozen: Choices (see freeze_choices()).
+    :param language: Current language. Labels are translated on compilation.
+
+    """
+    chunks = []
+    selectable = {}
+    positions = {}
+
+    def add_option(value, label):
+        idx = len(chunks)
+        head = f'\n  <option value="{esc_format(value)}"'
+        tail = f'>{esc_var(label)}</option>\n'
+        chunks.append(f'{head}{tail}')
+        selectable[idx] = (head, tail)
+        positions.setdefault(str(value), []).append(idx)
+
+    for _, option_value, _, option_label in frozen:
+
+        if option_value is None:
+            option_value = ''
+
+        if isinstance(option_label, tuple):
+            group_name = option_value
+
+            if group_name:
+                chunks.append(f'\n  <optgroup label="{esc_var(group_name)}">')
+
+            for _, subvalue, _, sublabel in option_label:
+                add_option(subvalue, sublabel)
+
+            if group_name:
+                chunks.append('\n  </optgroup>')
+
+        else:
+            add_option(option_value, option_label)
+
+    return OptionsCompiled(
+        html=''.join(chunks),
+        chunks=tuple(chunks),
+        selectable=selectable,
+        positions={value: tuple(idx) for value, idx in positions.items()},
+    )
+
+
+def render_options(widget: Select, value: List[str]) -> str:
+    """Renders options for the given select widget marking
+    the given values as selected.
+
+    Escaped options HTML is cached (see compile_options()),
+    so only `selected` attributes are placed on every render.
+
+    :param widget:
+    :param value: Formatted value (see widget.format_value())
+
+    """
+    frozen = freeze_choices(widget.choices)
+    language = get_language()
+
+    try:
+        compiled = compile_options(frozen, language)
+
+    except TypeError:
+        # Unhashable choices.
+        compiled = compile_options.__wrapped__(frozen, language)
+
+    positions = compiled.positions
+
+    if widget.allow_multiple_selected:
+        selected = {idx for val in value for idx in positions.get(val, ())}
+
+    else:
+        # Only the first matching option is selected.
+        selected = [positions[val][0] for val in value if val in positions]
+        selected = {min(selected)} if selected else None
+
+    if not selected:
+        return compiled.html
+
+    chunks = list(compiled.chunks)
+    selectable = compiled.selectable
+
+    for idx in selected:
+        head, tail = selectable[idx]
+        chunks[idx] = f'{head} selected{tail}'
+
+    return ''.join(chunks)
+
+
+def render_select(widget: Select, name: str, value: Any, attrs: TypeAttrsRaw) -> str:
+    attrs = widget.build_attrs(widget.attrs, attrs)
+
+    if widget.allow_multiple_selected:
+        attrs['multiple'] = True
+
+    options = render_options(widget, widget.format_value(value))
+
+    return f'<select name="{escape(name)}"{render_attrs(attrs)}>{options}\n</select>'
+
+
+NATIVE_RENDERERS: Dict[Type[Widget], TypeNativeRenderer] = {
+    TextInput: render_input,
+    NumberInput: render_input,
+    EmailInput: render_input,
+    URLInput: render_input,
+    PasswordInput: render_password,
+    HiddenInput: render_input,
+    CheckboxInput: render_checkbox,
+    Textarea: render_textarea,
+    Select: render_select,
+    SelectMultiple: render_select,
+}
+"""Native renderers for standard widgets. Maps exact widget classes to renderers."""
+
+
+def render_native(field: BoundField, attrs: Optional[TypeAttrsRaw] = None) -> Optional[str]:
+    """Renders a widget for the given bound field bypassing the template engine.
+
+    Returns None if a native renderer is not available for the widget
+    (custom widget classes or templates, non-default form renderer).
+    Use field.as_widget() in that case.
+
+    :param field:
+    :param attrs:
+
+    """
+    widget = field.field.widget
+    widget_cls = type(widget)
+    renderer = NATIVE_RENDERERS.get(widget_cls)
+
+    if (
+        renderer is None
+        or widget.template_name != widget_cls.template_name
+        or getattr(widget, 'option_template_name', None) != getattr(widget_cls, 'option_template_name', None)
+        # Stock widget templates are guaranteed only for the default renderer.
+        or type(field.form.renderer) is not DjangoTemplates
+    ):
+        return None
+
+    # Replicates BoundField.as_widget().
+    if field.field.localize:
+        widget.is_localized = True
+
+    attrs = field.build_widget_attrs(attrs or {}, widget)
+
+    if field.auto_id and 'id' not in widget.attrs:
+        attrs.setdefault('id', field.auto_id)
+
+    return mark_safe(renderer(widget, field.html_name, field.value(), attrs))
+
+
+def format_readonly_m2m(field: BoundField, widget: ReadOnlyWidget, value: Any) -> Any:
+    try:
+        value = getattr(field.form.instance, field.name, None)
+    except ValueError:  # generated due to m2m access from model without an id
+        value = None
+    return widget.get_multiple_items(value)
+
+
+def format_readonly_fk(field: BoundField, widget: ReadOnlyWidget, value: Any) -> Any:
+    # Do not try to pick all choices for FK.
+    return getattr(field.form.instance, field.name, None)
+
+
+def format_readonly_bool(field: BoundField, widget: ReadOnlyWidget, value: Any) -> Any:
+    if value is None:
+        return f"&lt;{_('unknown')}&gt;"
+    return _('Yes') if value else _('No')
+
+
+def format_readonly_choices(field: BoundField, widget: ReadOnlyWidget, value: Any) -> Any:
+    if value is None:
+        # Do not try to get title for None.
+        return value
+
+    return dict(field.field.choices or {}).get(value, f"&lt;{_('unknown')} ({value})&gt;")
+
+
+def format_readonly_original(field: BoundField, widget: ReadOnlyWidget, value: Any) -> Any:
+    original_widget = widget.original_widget
+    if original_widget:
+        value = original_widget.format_value(value)
+    return value
+
+
+def get_readonly_formatter(field: Field) -> TypeReadonlyFormatter:
+    """Returns a value formatter mimicking ReadOnlyWidget.format_value()
+    for the given form field.
+
+    :param field:
+
+    """
+    if isinstance(field, ModelMultipleChoiceField):
+        return format_readonly_m2m
+
+    if isinstance(field, ModelChoiceField):
+        return format_readonly_fk
+
+    if isinstance(field, BooleanField):
+        return format_readonly_bool
+
+    if getattr(field, 'choices', UNSET) is not UNSET:
+        return format_readonly_choices
+
+    return format_readonly_original
+
+
+_readonly_formatters: Dict[Tuple[Type[Field], bool], TypeReadonlyFormatter] = {}
+
+
+def render_readonly(field: BoundField, attrs: Optional[TypeAttrsRaw] = None) -> Optional[str]:
+    """Renders a read-only representation of a field value bypassing
+    widget context and rendering machinery (see ReadOnlyWidget).
+
+    Value formatters are chosen once per form field class (see get_readonly_formatter()).
+
+    Returns None if the field widget is not a ReadOnlyWidget
+    (custom subclasses are rendered as usual to respect their hooks).
+
+    :param field:
+    :param attrs:
+
+    """
+    base_field = field.field
+    widget = base_field.widget
+
+    if type(widget) is not ReadOnlyWidget:
+        return None
+
+    # Formatter depends on field class and choices availability.
+    key = (type(base_field), hasattr(base_field, 'choices'))
+    formatter = _readonly_formatters.get(key)
+
+    if formatter is None:
+        formatter = _readonly_formatters[key] = get_readonly_formatter(base_field)
+
+    # Replicates BoundField.as_widget().
+    if base_field.localize:
+        widget.is_localized = True
+
+    attrs = field.build_widget_attrs(attrs or {}, widget)
+
+    if field.auto_id and 'id' not in widget.attrs:
+        attrs.setdefault('id', field.auto_id)
+
+    value = formatter(field, widget, field.value())
+    value = Widget.format_value(widget, value) or ''
+
+    # Replicates ReadOnlyWidget.wrap_value().
+    return f'<div {render_flatatt(widget.build_attrs(widget.attrs, attrs))}>{value}</div>'
@@ -0,0 +1,60 @@
+from django import template
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.utils.safestring import SafeString, mark_safe
+
+from ..cache import render_fragment
+from ..export import ExportedForm
+
+if False:  # pragma: nocover
+    from ..base import SiteformsMixin  # noqa
+
+register = template.Library()
+
+
+@register.simple_tag
+def siteform(form: 'SiteformsMixin', *vary, timeout: int = DEFAULT_TIMEOUT) -> SafeString:
+    """Renders a form caching the result.
+
+    Cache key is derived from form and composer classes, language,
+    instance (pk, version), initial data, form arguments and the given vary-on values.
+    Bound (submitted) forms are rendered without cache.
+
+    Example::
+        {% siteform form request.user.pk timeout=300 %}
+
+    :param form:
+    :param vary: Additional values to vary cache on.
+    :param timeout: Cache timeout in seconds.
+
+    """
+    return mark_safe(render_fragment(form, vary=vary, timeout=timeout))
+
+
+@register.simple_tag
+def siteforms_widget(exported: ExportedForm, name: str, attrs: str = None) -> SafeString:
+    """Renders a field widget in an exported template (see export_template()).
+
+    Example::
+        {% siteforms_widget siteforms 'myfield' '{"class": "some"}' %}
+
+    :param exported:
+    :param name: Field name.
+    :param attrs: Widget attributes JSON.
+
+    """
+    return exported.widget(name, attrs)
+
+
+@register.simple_tag
+def siteforms_feedback(exported: ExportedForm, name: str = None) -> SafeString:
+    """Renders field feedback (errors) in an exported template (see export_template()).
+    If field name is not set, non-field feedback is rendered.
+
+    Example::
+        {% siteforms_feedback siteforms 'myfield' %}
+
+    :param exported:
+    :param name: Field name.
+
+    """
+    return exported.feedback(name)
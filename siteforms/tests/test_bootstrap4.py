@@ -15,12 +15,13 @@ def bs4_form_html(form_html):
     return partial(form_html, composer=Composer, model=Thing)
 
 
-def test_bs4_basic(bs4_form_html, form_fixture_match):
+@pytest.mark.parametrize('fast', [False, True])
+def test_bs4_basic(bs4_form_html, form_fixture_match, fast):
 
     thing = Thing()
     thing.save()
 
-    html = bs4_form_html({}, instance=thing)
+    html = bs4_form_html({'opt_widgets_fast': fast}, instance=thing)
 
     form_fixture_match(html, 'bs4_basic_1.html')
 
@@ -33,6 +34,9 @@ def test_bs4_size(bs4_form_html):
     html = bs4_form_html(dict(opt_size=Composer.SIZE_LARGE))
     assert 'form-control form-control-lg' in html
 
+    html = bs4_form_html(dict(opt_size=Composer.SIZE_SMALL, opt_custom_controls=True))
+    assert 'custom-select custom-select-sm' in html
+
 
 def test_bs4_custom_controls(bs4_form_html):
     html = bs4_form_html(dict(opt_custom_controls=True))
@@ -88,3 +92,27 @@ def test_bs4_groups(bs4_form_html, layout):
     html = bs4_form_html(layout)
     assert '<legend>MYBasicGroup</legend><div  class="form-row mx-0">' in html
     assert '<legend></legend>' in html  # no-title group
+
+
+def test_bs4_minify(bs4_form_html, layout, request_factory):
+    request = request_factory().get('some?__submit=siteform')
+
+    html = bs4_form_html({**layout, 'opt_minify': True}, src='GET', request=request)
+    assert '<form enctype="multipart/form-data" method="GET"><fieldset class="form-group"><legend>MYBasicGroup' in html
+    assert '</div></div><div class="form-row mx-0"><div class="form-group col">' in html
+    assert '<div class="invalid-feedback"><div>This field is required.</div></div>' in html
+    assert '</fieldset><fieldset class="form-group"><legend></legend>' in html
+    assert '<div >' not in html
+
+    # Widgets output is intact.
+    assert 'required id="id_ftext">\n</textarea>' in html
+
+    html_full = bs4_form_html(layout, src='GET', request=request)
+    assert len(html) < len(html_full)
+
+
+def test_minify_template():
+    from siteforms.composers.base import minify_template
+
+    assert minify_template('<div {attrs}>\n  <b>{field}</b>\n</div>') == '<div{attrs}><b>{field}</b></div>'
+    assert minify_template('<div {attrs}>\n<pre>{field}</pre> <b></b></div>') == '<div{attrs}>\n<pre>{field}</pre> <b></b></div>'
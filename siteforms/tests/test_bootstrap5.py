@@ -2,8 +2,10 @@ from functools import partial
 
 import pytest
 
+from siteforms.composers.base import ALL_FIELDS
 from siteforms.composers.bootstrap5 import Bootstrap5
-from siteforms.tests.testapp.models import Thing
+from siteforms.tests.testapp.models import Thing, Another, Additional
+from siteforms.toolbox import ModelForm
 
 
 class Composer(Bootstrap5):
@@ -15,12 +17,13 @@ def bs5_form_html(form_html):
     return partial(form_html, composer=Composer, model=Thing)
 
 
-def test_bs5_basic(bs5_form_html, form_fixture_match):
+@pytest.mark.parametrize('fast', [False, True])
+def test_bs5_basic(bs5_form_html, form_fixture_match, fast):
 
     thing = Thing()
     thing.save()
 
-    html = bs5_form_html({}, instance=thing)
+    html = bs5_form_html({'opt_widgets_fast': fast}, instance=thing)
 
     form_fixture_match(html, 'bs5_basic_1.html')
 
@@ -33,6 +36,48 @@ def test_bs5_size(bs5_form_html):
     assert 'form-control form-control-lg' in html
 
 
+def test_bs5_size_compiled(bs5_form_html):
+
+    class Small(Composer):
+        opt_size = Composer.SIZE_SMALL
+
+    assert Small.attrs[ALL_FIELDS]['class'] == 'form-control form-control-sm'
+
+    html = bs5_form_html(dict(opt_size=Composer.SIZE_SMALL), disabled_fields={'fchar'})
+    assert 'class="btn btn-sm btn-primary mt-3"' in html
+    assert 'form-select form-select-sm' in html
+
+    html = bs5_form_html(dict(opt_size=Composer.SIZE_SMALL, opt_disabled_plaintext=True), disabled_fields={'fchar'})
+    assert 'class=" form-control-plaintext"' in html
+
+    # sizing of parent is replaced
+    class Large(Small):
+        opt_size = Composer.SIZE_LARGE
+
+    assert Large.attrs[ALL_FIELDS]['class'] == 'form-control form-control-lg'
+
+    class Normal(Small):
+        opt_size = Composer.SIZE_NORMAL
+
+    assert Normal.attrs[ALL_FIELDS]['class'] == 'form-control'
+
+
+@pytest.mark.parametrize('size', [Composer.SIZE_SMALL, Composer.SIZE_LARGE])
+def test_bs5_size_subforms(form, size):
+
+    class AdditionalForm(ModelForm):
+
+        class Meta:
+            model = Additional
+            fields = '__all__'
+
+    form_cls = form(
+        model=Another, composer=Composer, options={'opt_size': size}, subforms={'fadd': AdditionalForm})
+
+    html = f"{form_cls(instance=Another(fsome='x', fadd=Additional(fnum='y')))}"
+    assert f'class="form-control form-control-{size}" required id="id_fadd-fnum"' in html
+
+
 def test_bs5_custom_columns(bs5_form_html, form_fixture_match):
     html = bs5_form_html(dict(opt_columns=True))
     assert 'class="col-2"' in html
@@ -70,3 +115,32 @@ def test_bs5_labels_floating(bs5_form_html):
 def test_bs5_switch(bs5_form_html):
     html = bs5_form_html(dict(opt_checkbox_switch=True))
     assert 'form-switch' in html
+
+
+def test_bs5_render_errors(form, request_post):
+
+    frm_cls = form(composer=Composer, model=Thing, options={'opt_box_ids': True}, fields=['fchar', 'fbool', 'ftext'])
+
+    html = f'{frm_cls()}'
+    assert '<div id="__nonfield_box" style="display: contents"></div>' in html
+    assert '<div id="id_fchar_box" style="display: contents"><div class="mb-3">' in html
+
+    request = request_post(data={'__submit': 'siteform', 'ftext': 'some'})
+    frm = frm_cls(request=request, src='POST')
+    html = f'{frm}'
+
+    errors = frm_cls(request=request, src='POST').render_errors()
+    assert list(errors) == ['__nonfield_box', 'id_fchar_box']
+    assert errors['__nonfield_box'] == ''
+    assert 'is-invalid' in errors['id_fchar_box']
+    assert f'<div id="id_fchar_box" style="display: contents">{errors["id_fchar_box"]}</div>' in html
+
+    # Previously invalid fields are rendered as well.
+    request = request_post(data={'__submit': 'siteform', 'fchar': 'one'})
+    errors = frm_cls(request=request, src='POST', prefix='pre').render_errors(previous=['fchar'])
+    assert list(errors) == ['pre-__nonfield_box', 'id_pre-fchar_box']
+
+    request = request_post(data={'__submit': 'siteform', 'fchar': 'one'})
+    errors = frm_cls(request=request, src='POST').render_errors(previous=['fchar'])
+    assert list(errors) == ['__nonfield_box', 'id_fchar_box', 'id_ftext_box']
+    assert 'is-valid' in errors['id_fchar_box']
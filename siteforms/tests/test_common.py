@@ -1,9 +1,13 @@
+import re
 from datetime import date
 
+import django
 import pytest
 from django.forms import ModelMultipleChoiceField
 
-from siteforms.composers.base import FormComposer, ALL_FIELDS
+from siteforms.composers.base import FormComposer, ALL_FIELDS, FORM
+from siteforms.composers.bootstrap4 import Bootstrap4
+from siteforms.composers.bootstrap5 import Bootstrap5
 from siteforms.tests.testapp.models import Thing, Another, Additional, AnotherThing, Link, WithThrough, ThroughModel
 from siteforms.toolbox import ModelForm, Form, fields
 
@@ -97,6 +101,31 @@ def test_append_attr_class():
     assert 'class="my yours"' in html
 
 
+def test_attrs_plan():
+
+    def get_css(composer, field):
+        return f'+dyn-{composer.form.prefix}'
+
+    class AdditionalWithDynamic(MyAdditionalForm):
+
+        class Composer(MyAdditionalForm.Composer):
+            attrs = {
+                ALL_FIELDS: {'class': 'my'},
+                'fnum': {'class': get_css, 'data-x': '+one'},
+            }
+
+    html = f'{AdditionalWithDynamic(prefix="a")}'
+    assert 'class="my dyn-a" data-x=" one"' in html
+
+    plans = AdditionalWithDynamic.Composer._attrs_plans
+    assert plans  # compiled on first use
+
+    # Plans are reused, yet dynamic values are evaluated on every render.
+    html = f'{AdditionalWithDynamic(prefix="b")}'
+    assert 'class="my dyn-b"' in html
+    assert len(AdditionalWithDynamic.Composer._attrs_plans) == len(plans)
+
+
 def test_id(form_html):
 
     thing = Thing()
@@ -147,6 +176,49 @@ def test_fields_disabled_all():
     assert 'disabled id="id_fforeign-fsome"' not in rendered  # in subform
 
 
+def test_fields_state(request_post):
+    from siteforms.cache import RE_CSRF_VALUE
+    from siteforms.widgets import ReadOnlyWidget
+
+    class StateForm(MyForm):
+
+        readonly_fields = {'fchoices'}
+        disabled_fields = {'fbool'}
+        hidden_fields = {'fdate'}
+
+    def spawn():
+        return StateForm(request=request_post(data={'fchar': 'x', '__submit': 'siteform'}), src='POST')
+
+    widgets = {name: field.widget for name, field in StateForm.base_fields.items()}
+
+    form = spawn()
+    assert not form.is_valid()
+
+    # Applied once to fields of the instance, reused by rendering.
+    readonly_widget = form.fields['fchoices'].widget
+    assert isinstance(readonly_widget, ReadOnlyWidget)
+    assert form['fchoices'].field is form.fields['fchoices']
+
+    html = f'{form}'
+    assert form.fields['fchoices'].widget is readonly_widget
+    assert 'name="fdate" id="id_fdate"' in html
+    assert 'name="fbool" aria-label="Fbool_name" disabled id="id_fbool"' in html
+    assert 'This field is required' in html
+
+    # Plan is shared by forms with the same settings.
+    plans = StateForm._fields_plans
+    plans_count = len(plans)
+    assert RE_CSRF_VALUE.sub('', f'{spawn()}') == RE_CSRF_VALUE.sub('', html)
+    assert len(plans) == plans_count
+
+    # Base fields stay intact.
+    assert {name: field.widget for name, field in StateForm.base_fields.items()} == widgets
+    assert not any(field.disabled for field in StateForm.base_fields.values())
+
+    html = f'{StateForm(request=request_post(data={"__submit": "siteform"}), src="POST", readonly_fields=[])}'
+    assert '<select name="fchoices"' in html
+
+
 def test_formset_m2m(request_post, request_get, db_queries):
 
     class MyFormWithSet(MyForm):
@@ -295,6 +367,126 @@ def test_formset_m2m_nested(request_post, request_get, db_queries):
     assert add2.fnum == 'www-y'
 
 
+@pytest.mark.parametrize('composer', [Composer, Bootstrap4, Bootstrap5])
+def test_formset_stencil(composer, request_post, request_get):
+    from siteforms.formsets import SiteformFormSetMixin
+
+    def make_form(stencil: bool):
+        nested = type('Nested', (MyAnotherNestedForm,), {
+            'Composer': type('Composer', (composer,), {'opt_formset_stencil': stencil}),
+        })
+        return type('Form', (MyAnotherThingForm,), {'subforms': {'fm2m': nested}})
+
+    WithStencil = make_form(True)
+    NoStencil = make_form(False)
+
+    add1 = Additional.objects.create(fnum='eee')
+    thing = AnotherThing.objects.create(fchar='one')
+    thing.fm2m.add(
+        Another.objects.create(fsome='888', fadd=add1),
+        Another.objects.create(fsome='999', fadd=add1),
+    )
+
+    def render(form_cls, request, **kwargs):
+        return f"{form_cls(request=request, src='GET', instance=thing, **kwargs)}"
+
+    SiteformFormSetMixin._stencils.clear()
+
+    html = render(WithStencil, request_get())
+    assert 'name="fm2m-1-fsome" value="999"' in html
+    assert html == render(NoStencil, request_get())
+
+    stencils = len(SiteformFormSetMixin._stencils)
+    assert stencils
+
+    html = render(WithStencil, request_get(), readonly_fields='__all__')
+    assert 'disabled>999</div>' in html
+    assert html == render(NoStencil, request_get(), readonly_fields='__all__')
+
+    # With errors.
+    data = (
+        '__submit=siteform&fchar=two'
+        '&fm2m-TOTAL_FORMS=3&fm2m-INITIAL_FORMS=2&fm2m-MIN_NUM_FORMS=0&fm2m-MAX_NUM_FORMS=1000'
+        '&fm2m-0-fsome=&fm2m-0-fadd-fnum=eee&fm2m-0-id=1'
+        f"&fm2m-1-fsome={'y' * 25}&fm2m-1-fadd-fnum=eee&fm2m-1-id=2"
+        '&fm2m-2-fsome=z&fm2m-2-fadd-fnum=eee&fm2m-2-id='
+    )
+    html = render(WithStencil, request_get(f'/?{data}'))
+    assert 'This field is required' in html
+    assert 'at most 20 characters' in html
+    assert html == render(NoStencil, request_get(f'/?{data}'))
+
+    # Stencils are reused.
+    assert len(SiteformFormSetMixin._stencils) == stencils + 1  # + readonly
+
+    # Submission state is not baked into stencils.
+    from django.http import QueryDict
+    from siteforms.cache import RE_CSRF_VALUE
+
+    SiteformFormSetMixin._stencils.clear()
+
+    def render_post(form_cls):
+        request = request_post(data=dict(QueryDict(data).items()))
+        return RE_CSRF_VALUE.sub('', f"{form_cls(request=request, src='POST', instance=thing)}")
+
+    html = render_post(WithStencil)
+    assert 'This field is required' in html
+    assert 'is-valid is-invalid' not in html
+    assert html == render_post(NoStencil)
+
+
+def test_formset_window(request_post, request_get):
+
+    class WindowedForm(MyAnotherThingForm):
+
+        subforms = {'fm2m': MyAnotherForm}
+        formset_kwargs = {'fm2m': {'window_size': 2, 'extra': 0}}
+
+    thing = AnotherThing.objects.create(fchar='one')
+    items = [Another.objects.create(fsome=f'item{idx}') for idx in range(5)]
+    thing.fm2m.add(*items)
+
+    html = f"{WindowedForm(request=request_get('/?fm2m-PAGE=2'), src='POST', instance=thing)}"
+    assert 'value="item1"' not in html
+    assert 'name="fm2m-0-fsome" value="item2"' in html
+    assert 'name="fm2m-1-fsome" value="item3"' in html
+    assert 'value="item4"' not in html
+    assert 'name="fm2m-INITIAL_FORMS" value="2"' in html
+    assert '<input type="hidden" name="fm2m-PAGE" value="2" id="id_fm2m-PAGE">' in html
+
+    # Page input id follows formset auto_id as for other fields.
+    for auto_id, expected in ((False, '<input type="hidden" name="fm2m-PAGE" value="1">'),
+                              ('plain', '<input type="hidden" name="fm2m-PAGE" value="1" id="fm2m-PAGE">')):
+        formset = WindowedForm(request=request_get(), src='POST', instance=thing).get_subform(name='fm2m')
+        formset.auto_id = auto_id
+        assert expected in formset._render_management()
+
+    # Out of range page falls back to the last one.
+    html = f"{WindowedForm(request=request_get('/?fm2m-PAGE=100'), src='POST', instance=thing)}"
+    assert 'name="fm2m-0-fsome" value="item4"' in html
+    assert 'name="fm2m-PAGE" value="3"' in html
+
+    # Save a page keeping other items.
+    form = WindowedForm(request=request_post(data={
+        'fchar': 'two',
+        'fm2m-TOTAL_FORMS': '2',
+        'fm2m-INITIAL_FORMS': '2',
+        'fm2m-MIN_NUM_FORMS': '0',
+        'fm2m-MAX_NUM_FORMS': '1000',
+        'fm2m-PAGE': '2',
+        'fm2m-0-fsome': 'edited2',
+        'fm2m-0-id': f'{items[2].id}',
+        'fm2m-1-fsome': 'edited3',
+        'fm2m-1-id': f'{items[3].id}',
+        '__submit': 'siteform',
+    }), src='POST', instance=thing)
+
+    assert form.is_valid()
+    form.save()
+
+    assert [item.fsome for item in thing.fm2m.order_by('id')] == ['item0', 'item1', 'edited2', 'edited3', 'item4']
+
+
 def test_fk(request_post, request_get):
 
     class MyFormWithFk(MyForm):
@@ -367,6 +559,32 @@ class MyFormWithFkNested(MyForm):
         fields = ['fchar', 'fforeign']
 
 
+def test_iter_render(request_get):
+
+    form = MyFormWithFkNested(request=request_get(), src='GET')
+    chunks = list(form.iter_render())
+    assert len(chunks) > 3
+    assert ''.join(chunks) == f'{form}'
+
+    # nested subforms are yielded as separate chunks
+    assert any(chunk.startswith('<span><input type="text" name="fforeign-fadd-fnum"') for chunk in chunks)
+
+    class MyFormWithSet(MyForm):
+
+        subforms = {
+            'fm2m': MyAdditionalForm,
+        }
+
+        class Meta(MyForm.Meta):
+            fields = ['fchar', 'fm2m']
+
+    form = MyFormWithSet(request=request_get(), src='POST')
+    formset = form.get_subform(name='fm2m')
+    chunks = list(formset.iter_render())
+    assert 'fm2m-TOTAL_FORMS' in chunks[0]
+    assert ''.join(chunks) == formset.render()
+
+
 def test_fk_nested(request_post, request_get):
 
     form = MyFormWithFkNested(request=request_get(), src='POST')
@@ -590,6 +808,117 @@ def test_cheap_details_view(request_get):
     assert nested_form.fields['fadd'].disabled
 
 
+class CachedReadonlyForm(MyFormWithSet):
+
+    render_cache_readonly = True
+    render_cache_version = 'fchar'
+    render_cache_invalidate = True
+
+
+def test_render_cache_readonly(request_get):
+
+    CachedForm = CachedReadonlyForm
+
+    add1 = Additional.objects.create(fnum='eee')
+    another1 = Another.objects.create(fsome='888', fadd=add1)
+    another2 = Another.objects.create(fsome='999', fadd=add1)
+
+    thing = AnotherThing.objects.create(fchar='one')
+    thing.fm2m.add(another1)
+
+    def render(**kwargs):
+        return f"{CachedForm(request=request_get(), src='POST', instance=thing, render_form_tag=False, **kwargs)}"
+
+    html = render(readonly_fields='__all__')
+    assert 'disabled>888</div>' in html
+    assert 'disabled>999</div>' not in html
+
+    # Served from cache.
+    Another.objects.filter(id=another1.id).update(fsome='777')
+    assert render(readonly_fields='__all__') == html
+
+    # Not read-only forms are not cached.
+    assert 'disabled>777</div>' in render()
+
+    # Version changed.
+    AnotherThing.objects.filter(id=thing.id).update(fchar='two')
+    thing.fchar = 'two'
+    assert 'disabled>777</div>' in render(readonly_fields='__all__')
+
+    # Invalidated by m2m_changed.
+    thing.fm2m.add(another2)
+    assert 'disabled>999</div>' in render(readonly_fields='__all__')
+
+    # Invalidated by post_save.
+    Another.objects.filter(id=another1.id).update(fsome='666')
+    assert 'disabled>777</div>' in render(readonly_fields='__all__')
+    thing.save()
+    assert 'disabled>666</div>' in render(readonly_fields='__all__')
+
+
+class CachedUnboundForm(MyAdditionalForm):
+
+    render_cache_unbound = True
+
+
+def test_render_cache_unbound(request_get):
+    from siteforms.cache import RE_CSRF_VALUE
+
+    CachedForm = CachedUnboundForm
+    base_label = CachedForm.base_fields['fnum'].label
+
+    def render(**kwargs):
+        return f"{CachedForm(request=request_get(), src='POST', **kwargs)}"
+
+    html1 = render()
+    CachedForm.base_fields['fnum'].label = 'changed'
+
+    # Served from cache with a new token.
+    html2 = render()
+    assert 'changed' not in html2
+
+    token1 = RE_CSRF_VALUE.search(html1).group(1)
+    token2 = RE_CSRF_VALUE.search(html2).group(1)
+    assert token1 and token2 and token1 != token2
+    assert html1.replace(token1, '') == html2.replace(token2, '')
+
+    assert 'changed' in render(prefix='other')
+    assert 'changed' in render(initial={'fnum': 'x'})
+
+    # Saved instances are not cached.
+    assert 'changed' in render(instance=Additional.objects.create(fnum='y'))
+
+    CachedForm.base_fields['fnum'].label = base_label
+
+
+def test_render_cache_collision():
+    from siteforms.cache import get_cls_path
+    from siteforms.composers.base import make_composer
+
+    def make_form(label):
+        # Different classes with the same path.
+        class CachedForm(Form):
+
+            fchar = fields.CharField(label=label)
+            render_cache_unbound = True
+
+            class Composer(FormComposer):
+                pass
+
+        return CachedForm
+
+    assert 'Alpha' in f'{make_form("Alpha")()}'
+    assert 'Beta' in f'{make_form("Beta")()}'
+
+    assert get_cls_path(make_form('Alpha')) is None
+    assert get_cls_path(CachedUnboundForm) == 'siteforms.tests.test_common.CachedUnboundForm'
+
+    # Interned composers are unique by their paths as long as their bases are.
+    assert get_cls_path(make_composer(FormComposer, {'opt_submit': 'Go'})).startswith(
+        'siteforms.composers.base.Composer_')
+    assert get_cls_path(make_composer(make_form('Alpha').Composer)) is None
+
+
 def test_multipart(request_get):
 
     form = LinkForm()
@@ -676,3 +1005,381 @@ def test_through(request_get, request_post, get_inputs):
     form.is_valid()
     html = f'{form}'
     assert 'id="id_through-0-id"' in html
+
+
+def test_make_composer():
+    from siteforms.composers.base import make_composer
+
+    options = {'opt_size': 'sm', 'groups': {'basic': 'Basic'}, 'layout': {ALL_FIELDS: '{field}'}}
+
+    composer = make_composer(Bootstrap5, options)
+    assert composer is make_composer((Bootstrap5,), {**options, 'groups': {'basic': 'Basic'}})
+    assert composer.opt_size == 'sm'
+    assert composer.layout[ALL_FIELDS] == '{field}'
+
+    assert make_composer(Bootstrap5, {**options, 'opt_size': 'lg'}) is not composer
+    assert make_composer(Bootstrap5, {**options, 'groups': {'basic': 'Other'}}) is not composer
+    assert composer.__qualname__.startswith('Composer_')
+
+    # Unhashable values are tolerated.
+    unhashable = {'opt_submit': type('Unhashable', (), {'__hash__': None})()}
+    assert make_composer(Bootstrap5, unhashable) is not make_composer(Bootstrap5, unhashable)
+
+
+def test_composer_options(request_post):
+
+    class OptionsForm(MyAdditionalForm):
+
+        class Composer(Bootstrap5):
+            pass
+
+    form = OptionsForm(composer_options={'opt_render_labels': False, 'opt_submit_name': 'go'})
+    composer = form.get_composer()
+    assert composer is form.get_composer()  # reused
+    assert not composer.opt_render_labels
+    assert OptionsForm.Composer.opt_render_labels
+
+    html = f'{form}'
+    assert '<label' not in html
+    assert 'name="go"' in html
+    assert '<label' in f'{OptionsForm()}'
+
+    form = OptionsForm(
+        request=request_post(data={'go': 'siteform'}), src='POST', composer_options={'opt_submit_name': 'go'})
+    assert form.is_submitted
+
+    with pytest.raises(ValueError):
+        OptionsForm(composer_options={'opt_size': 'sm'}).get_composer()
+
+    with pytest.raises(ValueError):
+        OptionsForm(composer_options={'attrs': {}}).get_composer()
+
+
+class TagForm(MyAdditionalForm):
+
+    rendered = []
+
+    def iter_render(self):
+        self.rendered.append(self)
+        yield from super().iter_render()
+
+
+def test_siteform_tag(request_get, request_post):
+    from django.template import Template, Context
+    from siteforms.cache import RE_CSRF_VALUE
+
+    rendered = TagForm.rendered
+    rendered.clear()
+
+    template = Template('{% load siteforms %}{% siteform form vary timeout=60 %}')
+
+    def render(form, vary=1):
+        return template.render(Context({'form': form, 'vary': vary}))
+
+    thing = Additional.objects.create(fnum='one')
+
+    html = render(TagForm(request=request_get(), src='POST', instance=thing))
+    assert 'value="one"' in html
+    assert 'csrfmiddlewaretoken' in html
+
+    html_cached = render(TagForm(request=request_get(), src='POST', instance=thing))
+    assert len(rendered) == 1
+    assert html_cached != html  # new CSRF token
+    assert RE_CSRF_VALUE.sub('', html_cached) == RE_CSRF_VALUE.sub('', html)
+
+    render(TagForm(request=request_get(), src='POST', instance=thing), vary=2)
+    assert len(rendered) == 2
+
+    # Instance data changed.
+    thing.fnum = 'two'
+    thing.save()
+    assert 'value="two"' in render(TagForm(request=request_get(), src='POST', instance=thing))
+    assert len(rendered) == 3
+
+    # Bound forms are not cached.
+    request = request_post(data={'__submit': 'siteform', 'fnum': 'three'})
+    render(TagForm(request=request, src='POST', instance=thing))
+    render(TagForm(request=request, src='POST', instance=thing))
+    assert len(rendered) == 5
+
+
+def test_render_rows(request_get):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    class RowForm(MyAnotherThingForm):
+
+        class Composer(MyAnotherThingForm.Composer):
+            opt_readonly_fast = True
+
+    add = Additional.objects.create(fnum='eee')
+
+    for idx in range(5):
+        thing = AnotherThing.objects.create(fchar=f'thing{idx}')
+        thing.fm2m.add(
+            Another.objects.create(fsome=f'{idx}-1', fadd=add),
+            Another.objects.create(fsome=f'{idx}-2', fadd=add),
+        )
+
+    queryset = AnotherThing.objects.order_by('id')
+
+    expected = [
+        f"{RowForm(instance=thing, readonly_fields='__all__', render_form_tag=False)}"
+        for thing in queryset
+    ]
+    assert 'required>thing3</div>' in expected[3]
+
+    with CaptureQueriesContext(connection) as queries:
+        rows = list(RowForm.render_rows(queryset))
+
+    assert rows == expected
+    assert len(queries) == 2  # things + prefetched m2m
+
+
+def test_arender_unsupported(monkeypatch, request_get):
+    import asyncio
+
+    monkeypatch.setattr('siteforms.utils.DJANGO_VERSION', (4, 0))
+
+    form = MyForm(request=request_get(), src='POST')
+
+    with pytest.raises(ValueError):
+        asyncio.run(form.arender())
+
+    with pytest.raises(ValueError):
+        asyncio.run(form.aprefetch())
+
+    with pytest.raises(ValueError):
+        asyncio.run(form.get_composer().arender())
+
+
+@pytest.mark.skipif(django.VERSION < (4, 1), reason='Async ORM requires Django 4.1+')
+def test_arender(request_get, request_post):
+    from asgiref.sync import async_to_sync, sync_to_async
+    from django.core.exceptions import SynchronousOnlyOperation
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from siteforms.cache import RE_CSRF_VALUE
+
+    def strip_csrf(html):
+        return RE_CSRF_VALUE.sub('', html)
+
+    class MyFormWithNestedSet(MyAnotherThingForm):
+
+        subforms = {
+            'fm2m': MyAnotherNestedForm,
+        }
+
+        formset_kwargs = {
+            'fm2m': {'extra': 0, 'window_size': 2},
+        }
+
+    add1 = Additional.objects.create(fnum='eee')
+    add2 = Additional.objects.create(fnum='www')
+    another1 = Another.objects.create(fsome='888', fadd=add1)
+    another2 = Another.objects.create(fsome='999', fadd=add2)
+
+    thing = Thing.objects.create(fchar='one', fforeign=another1)
+    thing.fm2m.add(add1, add2)
+
+    thing_another = AnotherThing.objects.create(fchar='two')
+    thing_another.fm2m.add(another1, another2)
+
+    cases = [
+        (MyForm, lambda: {'instance': Thing.objects.get(id=thing.id)}),
+        (MyForm, lambda: {'instance': Thing.objects.get(id=thing.id), 'readonly_fields': '__all__'}),
+        (MyFormWithFkNested, lambda: {'instance': Thing.objects.get(id=thing.id)}),
+        (MyFormWithNestedSet, lambda: {'instance': AnotherThing.objects.get(id=thing_another.id)}),
+    ]
+
+    request = request_get()
+
+    for form_cls, get_kwargs in cases:
+        expected = strip_csrf(f'{form_cls(request=request, src="POST", **get_kwargs())}')
+
+        form = form_cls(request=request, src='POST', **get_kwargs())
+        assert strip_csrf(async_to_sync(form.arender)()) == expected
+
+        # All data required is prefetched.
+        form = form_cls(request=request, src='POST', **get_kwargs())
+        async_to_sync(form.aprefetch)()
+
+        with CaptureQueriesContext(connection) as queries:
+            html = f'{form}'
+
+        assert strip_csrf(html) == expected
+        assert not queries.captured_queries
+
+    assert 'name="fm2m-0-fadd-fnum" value="eee"' in expected
+    assert 'fm2m-PAGE' in expected
+
+    form = MyForm(request=request_get(), src='POST', readonly_fields='__all__', instance=thing)
+    html = async_to_sync(form.get_composer().arender)(render_form_tag=False)
+    assert 'id="id_fforeign" disabled required>888</div>' in html
+    assert '<form' not in html
+
+    # Bound forms are validated beforehand.
+    form = MyForm(request=request_post(data={'fchar': 'x', '__submit': 'siteform'}), src='POST')
+    html = async_to_sync(form.arender)()
+    assert 'This field is required' in html
+    assert 'value="x"' in html
+
+    formset = MyFormWithNestedSet(
+        request=request_get(), src='POST', instance=thing_another).get_subform(name='fm2m')
+    assert 'value="999"' in async_to_sync(formset.arender)()
+
+    # Rendering requiring database access is not retried in a thread.
+    class QueryingWidget(fields.TextInput):
+
+        def render(self, *args, **kwargs):
+            Thing.objects.count()
+            return super().render(*args, **kwargs)
+
+    class FallbackForm(Form):
+
+        fdate = fields.DateField(widget=fields.HiddenInput)
+        fquery = fields.CharField(widget=QueryingWidget)
+
+        class Composer(Composer):
+            pass
+
+    form = FallbackForm(request=request_post(data={'fdate': 'bogus', '__submit': 'siteform'}), src='POST')
+
+    with pytest.raises(SynchronousOnlyOperation) as e:
+        async_to_sync(form.arender)()
+    assert 'sync_to_async' in f'{e.value}'
+
+    form = FallbackForm(request=request_post(data={'fdate': 'bogus', '__submit': 'siteform'}), src='POST')
+    html = async_to_sync(sync_to_async(form.render))()
+    assert html.count('Hidden field "fdate": Enter a valid date.') == 1
+    assert html.count('This field is required') == 1
+
+
+@pytest.mark.parametrize('composer', ['bootstrap4', 'bootstrap5'])
+def test_debug(composer, request_get, settings):
+    from importlib import import_module
+
+    composer_cls = getattr(import_module(f'siteforms.composers.{composer}'), composer.capitalize())
+
+    class DebugAnotherForm(MyAnotherNestedForm):
+
+        Composer = composer_cls
+
+    class DebugForm(MyForm):
+
+        subforms = {
+            'fforeign': DebugAnotherForm,
+        }
+
+        class Composer(composer_cls):
+            layout = {
+                FORM: {
+                    'basic': ['fchar', ['fbool', 'fforeign']],
+                    '_': ALL_FIELDS,
+                },
+            }
+
+    thing = Thing.objects.create(fchar='one', fforeign=Another.objects.create(
+        fsome='888', fadd=Additional.objects.create(fnum='eee')))
+    thing = Thing.objects.get(id=thing.id)
+
+    html = f'{DebugForm(request=request_get(), instance=thing)}'
+    assert '<!--' not in html
+
+    html_debug = f"{DebugForm(request=request_get(), instance=thing, composer_options={'opt_debug': True})}"
+    assert '<!-- siteforms group basic: ' in html_debug
+    assert 'DebugForm.Composer, TextInput -->' in html_debug
+    assert '<!-- siteforms field fchar: ' in html_debug
+    assert '<!-- siteforms subform fforeign: ' in html_debug
+    assert '<!-- siteforms field fsome: ' in html_debug  # nested subform composer
+    assert '<!-- siteforms field fnum: ' in html_debug
+    assert '<!-- /siteforms subform fforeign: ' in html_debug
+    assert re.search(r'<!-- /siteforms field fm2m: [\d.]+ ms, 1 queries -->', html_debug)  # choices
+
+    # Annotations stripped.
+    assert re.sub(r'<!-- /?siteforms .*? -->', '', html_debug) == html
+
+    # Queries made by a consumer between chunks are not counted.
+    def produce():
+        yield 'a'
+        Thing.objects.count()
+        yield 'b'
+
+    composer = DebugForm(request=request_get()).get_composer()
+    debug_chunks = []
+
+    for chunk in composer._iter_debug('field', 'some', produce()):
+        debug_chunks.append(chunk)
+        Thing.objects.count()
+
+    assert debug_chunks[1:3] == ['a', 'b']
+    assert debug_chunks[-1].endswith(' ms, 1 queries -->')
+
+    # Switched on by settings.
+    settings.SITEFORMS_DEBUG = True
+    html = f'{MyFormWithSet(request=request_get())}'
+    assert '<!-- siteforms field fchar: ' in html
+    assert '<!-- siteforms field fsome: ' in html  # formset forms are not rendered with stencils
+
+    assert '<!--' not in f"{DebugForm(request=request_get(), composer_options={'opt_debug': False})}"
+
+
+def test_threads(request_get):
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    class StressSubform(Form):
+
+        fsub = fields.CharField(label='fsub')
+
+    class StressForm(Form):
+
+        subforms = {'fjson': StressSubform}
+
+        fchar = fields.CharField(label='fchar', max_length=5)
+        fchoice = fields.ChoiceField(label='fchoice', choices=Thing.CHOICES1.items())
+        fbool = fields.BooleanField(label='fbool', required=False)
+        fjson = fields.CharField(label='fjson')
+
+        class Composer(Composer):
+            pass
+
+    variants = [
+        {},
+        {'readonly_fields': '__all__'},
+        {'readonly_fields': {'fchar', 'fchoice'}},
+        {'disabled_fields': {'fbool'}, 'hidden_fields': {'fchar'}},
+        {'hidden_fields': {'fchoice'}},
+    ]
+    queries = [
+        '',
+        '?__submit=siteform&fchar=abc&fchoice=one&fbool=on&fjson-fsub=x',
+        '?__submit=siteform&fchar=toolong&fchoice=bogus',
+    ]
+    tasks = [(variant_idx, query_idx) for variant_idx in range(len(variants)) for query_idx in range(len(queries))]
+
+    def run(task):
+        variant_idx, query_idx = task
+        form = StressForm(request=request_get(queries[query_idx]), src='GET', **variants[variant_idx])
+        valid = form.is_valid()
+        return valid, f'{form}'
+
+    expected = {task: run(task) for task in tasks}
+    assert len({html for _, html in expected.values()}) > len(variants)
+
+    widgets = {name: (field.widget, field.disabled) for name, field in StressForm.base_fields.items()}
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            for _ in range(3):
+                batch = tasks * 4
+                for task, result in zip(batch, executor.map(run, batch)):
+                    assert result == expected[task], task
+
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert {name: (field.widget, field.disabled) for name, field in StressForm.base_fields.items()} == widgets
@@ -0,0 +1,112 @@
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.template import engines
+
+from siteforms.composers.base import FormComposer
+from siteforms.composers.bootstrap4 import Bootstrap4
+from siteforms.composers.bootstrap5 import Bootstrap5
+from siteforms.export import export_template, render_exported
+from siteforms.tests.testapp.models import Thing, Another, AnotherThing
+from siteforms.toolbox import ModelForm, fields
+
+
+RE_CSRF = re.compile('(?<=name="csrfmiddlewaretoken" value=")[^"]*')
+
+
+class ExportForm(ModelForm):
+
+    some = fields.CharField(widget=fields.HiddenInput, required=False)
+
+    class Meta:
+        model = Thing
+        fields = ['fchar', 'fchoices', 'fbool', 'ftext', 'fforeign', 'fm2m', 'fdate']
+
+    class Composer(FormComposer):
+        opt_placeholder_label = True
+
+
+@pytest.mark.parametrize('composer', [FormComposer, Bootstrap4, Bootstrap5])
+def test_export(composer, request_factory, request_get):
+
+    form_cls = type('MyForm', (ExportForm,), {
+        'Composer': type('Composer', (composer,), {'opt_placeholder_label': True}),
+    })
+
+    def check(**kwargs):
+        exported = export_template(form_cls, id='myform', target_url='/here/', src=kwargs.get('src'))
+        assert exported.startswith('{% load siteforms %}')
+        assert "{% siteforms_widget siteforms 'fchar' '{" in exported
+
+        template = engines['django'].from_string(exported)
+
+        form = form_cls(id='myform', target_url='/here/', **kwargs)
+        expected = RE_CSRF.sub('', f'{form}')
+        form = form_cls(id='myform', target_url='/here/', **kwargs)
+        assert RE_CSRF.sub('', render_exported(form, template)) == expected
+        return expected
+
+    assert 'csrfmiddlewaretoken' not in check()
+    assert 'csrfmiddlewaretoken' in check(request=request_get(), src='POST')
+
+    # Submitted with errors.
+    request = request_factory().get('some?__submit=siteform&fchar=&some=hmm&fdate=bogus')
+    html = check(request=request, src='GET')
+    assert 'Enter a valid date.' in html
+
+    if composer is not FormComposer:
+        # Composer own wrappers are exported.
+        assert '<span>' not in html
+        assert '<div class="mb-3' in html if composer is Bootstrap5 else '<div class="form-group' in html
+
+
+class ExportAnotherForm(ModelForm):
+
+    class Meta:
+        model = Another
+        fields = ['fsome']
+
+
+class ExportFormsetForm(ModelForm):
+
+    subforms = {'fm2m': ExportAnotherForm}
+
+    class Meta:
+        model = AnotherThing
+        fields = ['fchar', 'fm2m']
+
+
+@pytest.mark.parametrize('composer', [FormComposer, Bootstrap4, Bootstrap5])
+def test_export_formset(composer, request_get):
+
+    form_cls = type('MyForm', (ExportFormsetForm,), {'Composer': type('Composer', (composer,), {})})
+
+    thing = AnotherThing.objects.create(fchar='one')
+    thing.fm2m.add(Another.objects.create(fsome='888'))
+
+    template = engines['django'].from_string(export_template(form_cls, src='GET'))
+
+    expected = f"{form_cls(request=request_get(), src='GET', instance=thing)}"
+    html = render_exported(form_cls(request=request_get(), src='GET', instance=thing), template)
+    assert html == expected
+    assert 'name="fm2m-TOTAL_FORMS"' in html
+    assert 'name="fm2m-0-fsome" value="888"' in html
+
+
+def test_export_jinja():
+    exported = export_template(ExportForm, engine='jinja2')
+    assert "{{ siteforms.widget('fchar', '{" in exported
+    assert "{{ siteforms.feedback('fchar') }}" in exported
+    assert "{{ siteforms.widget('some') }}" in exported
+    assert '{% if siteforms.csrf %}{{ csrf_input }}{% endif %}' in exported
+
+    with pytest.raises(ValueError):
+        export_template(ExportForm, engine='mako')
+
+
+def test_export_command():
+    out = StringIO()
+    call_command('siteforms_export', 'siteforms.tests.test_export.ExportForm', stdout=out)
+    assert out.getvalue() == export_template(ExportForm)
@@ -1,7 +1,7 @@
 from datetime import date
 
 from siteforms.composers.base import FormComposer
-from siteforms.tests.testapp.models import Thing
+from siteforms.tests.testapp.models import Thing, Another
 from siteforms.toolbox import FilteringModelForm, FilteringForm, fields
 
 
@@ -103,3 +103,68 @@ def test_basics(form, request_get):
     assert len(things_some) == 3
     assert set(things_some) == {thing1, thing2, thing4}
     assert applied
+
+
+def test_fields_not_shared():
+
+    class MyForm(FilteringForm):
+
+        fchoices = fields.ChoiceField(label='fchoices', choices=Thing.CHOICES1.items())
+
+        class Composer(FormComposer):
+            ...
+
+    class MyChildForm(MyForm):
+        ...
+
+    declared = MyForm.declared_fields['fchoices']
+    assert declared.widget.choices == list(Thing.CHOICES1.items())
+
+    for form_cls in (MyForm, MyChildForm):
+        field = form_cls.base_fields['fchoices']
+        assert field is not declared
+        assert [value for value, _ in field.widget.choices] == ['*', 'one', 'two']
+        assert 'value="*" selected>----' in f'{form_cls()}'
+
+
+def test_foreign(request_get, db_queries):
+
+    # Model choices are not fetched on class creation.
+    with db_queries.scope(expect=0):
+
+        class MyForm(FilteringModelForm):
+
+            filtering_fields_optional = '__all__'
+
+            class Composer(FormComposer):
+                ...
+
+            class Meta:
+                model = Thing
+                fields = ['fforeign']
+
+    another = Another.objects.create(fsome='other')
+    thing = Thing.objects.create(fchar='1', fforeign=another)
+    Thing.objects.create(fchar='2')
+
+    html = f'{MyForm()}'
+    assert '<option value="*" selected>----</option>' in html
+    assert f'<option value="{another.pk}">other</option>' in html
+
+    def apply_filter(get_str):
+        return MyForm(
+            request=request_get(f'some?__submit=siteform&{get_str}'),
+            src='GET',
+        ).filtering_apply(Thing.objects.all())
+
+    things, applied = apply_filter('fforeign=*')
+    assert len(things) == 2
+    assert not applied
+
+    things, applied = apply_filter(f'fforeign={another.pk}')
+    assert list(things) == [thing]
+    assert applied
+
+    html = f'{MyForm(request=request_get(f"some?__submit=siteform&fforeign={another.pk}"), src="GET")}'
+    assert '<option value="*">----</option>' in html
+    assert f'<option value="{another.pk}" selected>other</option>' in html
@@ -0,0 +1,112 @@
+import json
+
+from siteforms.composers.json import JSONComposer
+from siteforms.tests.testapp.models import Thing, Another, Additional, AnotherThing
+from siteforms.toolbox import ModelForm
+
+
+class Composer(JSONComposer):
+    """"""
+
+
+class MyAnotherForm(ModelForm):
+
+    class Meta:
+        model = Another
+        fields = '__all__'
+
+
+class MyAnotherThingForm(ModelForm):
+
+    subforms = {'fm2m': MyAnotherForm}
+    formset_kwargs = {'fm2m': {'extra': 0}}
+
+    class Meta:
+        model = AnotherThing
+        fields = '__all__'
+
+    class Composer(Composer):
+        pass
+
+
+def test_json_basic(form, layout, request_post):
+
+    Another.objects.create(fsome='opt')
+
+    frm_cls = form(composer=Composer, model=Thing, options=layout)
+    frm = frm_cls(request=request_post(data={'__submit': 'siteform', 'fchar': 'x<'}), src='POST')
+
+    described = json.loads(f'{frm}')
+
+    assert described['errors'] == []
+    assert described['deferred'] == []
+    assert described['layout'][0] == {
+        'group': 'basic', 'title': 'MYBasicGroup', 'rows': [[['fchar'], ['fbool']], ['ftext']]}
+    assert described['layout'][1]['rows'] == [['ffile']]
+
+    form_tag = described['form']
+    assert form_tag['attrs'] == {'method': 'POST', 'enctype': 'multipart/form-data'}
+    assert form_tag['csrf']
+    assert form_tag['submit'] == {'name': '__submit', 'value': 'siteform', 'title': 'Submit'}
+
+    fields = described['fields']
+    fchar = fields['fchar']
+    assert fchar['value'] == 'x<'
+    assert fchar['label'] == 'Fchar_name'
+    assert fchar['widget'] == 'TextInput'
+    assert fchar['input_type'] == 'text'
+    assert fchar['errors'] == []
+    assert fchar['attrs'] == {'aria-describedby': 'id_fchar_help'}
+    assert fields['ftext']['errors'] == ['This field is required.']
+    assert fields['fchoices']['choices'] == [['', '---------'], ['one', '1'], ['two', '2']]
+    assert fields['fforeign']['choices'][1][1] == 'opt'
+
+    # Static parts are cached.
+    assert len(frm_cls.Composer._static) == 1
+    frm = frm_cls(hidden_fields={'fchar'}, readonly_fields={'fbool'})
+    described = frm.get_composer().describe(render_form_tag=False)
+    assert 'form' not in described
+    assert len(frm_cls.Composer._static) == 1
+
+    described = json.loads(f'{frm}')
+    assert described['fields']['fchar']['hidden']
+    assert described['fields']['fchar']['widget'] == 'HiddenInput'
+    assert described['fields']['fbool']['readonly']
+    assert described['fields']['fbool']['display'] == 'No'
+
+    # Deferred groups are not described.
+    frm_cls = form(composer=Composer, model=Thing, options={**layout, 'groups_deferred': {'basic'}})
+    described = json.loads(f'{frm_cls()}')
+    assert described['deferred'] == ['basic']
+    assert 'fchar' not in described['fields']
+    assert 'ffile' in described['fields']
+
+
+def test_json_subforms(request_get):
+
+    add = Additional.objects.create(fnum='eee')
+    thing = AnotherThing.objects.create(fchar='one')
+    thing.fm2m.add(Another.objects.create(fsome='888', fadd=add))
+
+    described = json.loads(f"{MyAnotherThingForm(request=request_get(), instance=thing)}")
+
+    assert described['layout'] == ['fchar', 'fm2m']
+
+    subform = described['fields']['fm2m']['subform']
+    assert subform['management']['fm2m-TOTAL_FORMS'] == 1
+
+    subform = subform['forms'][0]
+    assert subform['prefix'] == 'fm2m-0'
+    assert 'form' not in subform
+    assert subform['fields']['fsome']['value'] == '888'
+    assert subform['fields']['fsome']['name'] == 'fm2m-0-fsome'
+
+
+def test_json_static_cache_off(form):
+
+    frm_cls = form(composer=Composer, model=Thing, options={'opt_cache_static': False}, fields=['fchar'])
+
+    Composer._static.clear()
+    described = json.loads(f'{frm_cls()}')
+    assert list(described['fields']) == ['fchar']
+    assert not frm_cls.Composer._static
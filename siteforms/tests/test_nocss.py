@@ -3,7 +3,7 @@ from functools import partial
 import pytest
 from django.forms import fields
 
-from siteforms.composers.base import FormComposer, FORM, ALL_FIELDS
+from siteforms.composers.base import FormComposer, FORM, ALL_FIELDS, compile_template
 from siteforms.tests.testapp.models import Thing
 
 
@@ -34,12 +34,13 @@ def test_nonfield_errors(form, request_factory):
     assert 'Hidden field "some": Enter a valid date.' in form_html
 
 
-def test_nocss_basic(nocss_form_html, form_fixture_match):
+@pytest.mark.parametrize('fast', [False, True])
+def test_nocss_basic(nocss_form_html, form_fixture_match, fast):
 
     thing = Thing()
     thing.save()
 
-    html = nocss_form_html({}, instance=thing)
+    html = nocss_form_html({'opt_widgets_fast': fast}, instance=thing)
 
     form_fixture_match(html, 'nocss_basic_1.html')
 
@@ -125,6 +126,131 @@ def test_nocss_layout(nocss_form_html):
         '</textarea></span></div></div>' in html)
 
 
+def test_nocss_layout_plan(form):
+
+    frm_cls = form(composer=Composer, model=Thing, options={
+        'layout': {FORM: {'some': ['fchar', ['fbool', 'unknown']], 'other': ALL_FIELDS}},
+    })
+    html = f'{frm_cls()}'
+    assert 'name="fchar"' in html
+    assert 'name="ftext"' in html
+
+    plans = frm_cls.Composer._layout_plans
+    assert len(plans) == 1
+    names, (fields, groups, leftovers) = list(plans.items())[0]
+    assert 'fchar' in names
+    assert fields is None
+    assert groups[0] == ('some', (('fchar',), (('fbool',), (None,))))
+    assert not leftovers
+
+    # Plans are shared by forms of different classes.
+    frm_cls2 = type('Other', (frm_cls,), {})
+    assert f'{frm_cls2()}' == html
+    assert len(plans) == 1
+
+    frm_cls = form(composer=Composer, model=Thing, options={
+        'layout': {FORM: {'some': ['fchar', 'bogus']}},
+    })
+    with pytest.raises(ValueError) as e:
+        f'{frm_cls()}'
+    assert '"bogus"' in f'{e.value}'
+
+
+def test_nocss_templates(nocss_form_html):
+
+    assert compile_template('<div {attrs}>{{{fields}}}</div>') == (
+        '<div ', (('attrs', '>{'), ('fields', '}</div>')), ('attrs', 'fields'))
+    assert compile_template('{field!r}') is None  # falls back to format_map
+
+    html = nocss_form_html(dict(wrappers={ALL_FIELDS: '<p>{{{field}}}</p>'}))
+    assert '<p>{<label for="id_fchar">' in html
+    assert '</small>}</p>' in html
+
+
 def test_nocss_nonmultipart(form):
     frm = form(composer=Composer, some=fields.CharField())()
     assert '<form  method="POST">' in f'{frm}'
+
+
+def test_nocss_partial(form, layout):
+
+    frm_cls = form(composer=Composer, model=Thing, options=layout)
+    html = f'{frm_cls()}'
+
+    frm = frm_cls(disabled_fields={'fchar'})
+    group = frm.render_group('basic')
+    assert group.startswith('<fieldset ><legend>MYBasicGroup</legend>')
+    assert 'required disabled id="id_fchar"' in group
+    assert 'name="ftext"' in group
+    assert 'name="ffile"' not in group
+    assert group.replace(' disabled', '') in html
+
+    # Only fields of the group are bound.
+    assert set(frm._bound_fields_cache) == {'fchar', 'fbool', 'ftext'}
+
+    frm = frm_cls(readonly_fields='__all__')
+    group = frm.render_group('basic')
+    assert 'id="id_fchar" disabled required></div>' in group
+    assert set(frm._bound_fields_cache) == {'fchar', 'fbool', 'ftext'}
+
+    frm = frm_cls(readonly_fields='__all__')
+    assert 'id="id_ftext"' in frm.render_field('ftext')
+    assert set(frm._bound_fields_cache) == {'ftext'}
+
+    field = frm_cls().render_field('ffile')
+    assert field.startswith('<span><label for="id_ffile">')
+    assert field in html
+
+    with pytest.raises(ValueError):
+        frm.render_group('unknown')
+
+
+def test_nocss_deferred(form, layout, request_get, request_post):
+
+    frm_cls = form(composer=Composer, model=Thing, options={**layout, 'groups_deferred': {'basic'}})
+    full = form(composer=Composer, model=Thing, options=layout)().render_group('basic')
+
+    html = f'{frm_cls(target_url="/here/")}'
+    assert '<div data-siteforms-deferred="basic" data-url="/here/?__group=basic"></div>' in html
+    assert 'name="fchar"' not in html
+    assert 'name="ffile"' in html
+
+    marker = '<input type="hidden" name="__group_loaded" value="basic">'
+
+    assert frm_cls(request=request_get('/')).render_deferred() is None
+    assert frm_cls(request=request_get('/?__group=other')).render_deferred() is None
+    assert frm_cls(request=request_get('/?__group=basic')).render_deferred() == f'{marker}{full}'
+
+    html = f'{frm_cls(prefix="pre")}'
+    assert 'data-url="?pre-__group=basic"' in html
+    html = frm_cls(request=request_get('/?pre-__group=basic'), prefix='pre').render_deferred()
+    assert '<input type="hidden" name="pre-__group_loaded" value="basic">' in html
+
+    frm_cls = form(
+        composer=Composer, model=Thing, fields=['fchar', 'fbool', 'ftext', 'ffile', 'fchoices'],
+        options={**layout, 'groups_deferred': {'basic'}})
+
+    thing = Thing.objects.create(fchar='one', fbool=True, ftext='text', ffile='some.txt', fchoices='one')
+
+    # Groups not loaded into submitted forms are neither cleaned nor saved.
+    frm = frm_cls(request=request_post(data={'__submit': 'siteform', 'fchoices': 'two'}), src='POST', instance=thing)
+    assert frm.is_valid(), frm.errors
+    frm.save()
+
+    thing.refresh_from_db()
+    assert (thing.fchar, thing.fbool, thing.ftext, thing.fchoices) == ('one', True, 'text', 'two')
+
+    html = f'{frm}'
+    assert 'data-siteforms-deferred="basic"' in html
+    assert 'name="fchar"' not in html
+
+    # Loaded groups are.
+    frm = frm_cls(request=request_post(data={
+        '__submit': 'siteform', '__group_loaded': 'basic', 'fchar': '', 'fchoices': 'one',
+    }), src='POST', instance=thing)
+    assert not frm.is_valid()
+    assert 'fchar' in frm.errors
+
+    html = f'{frm}'
+    assert marker in html
+    assert 'name="fchar"' in html
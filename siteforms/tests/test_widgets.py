@@ -45,3 +45,130 @@ def test_basic(form):
     assert 'mywidgetdata' in html  # data from template
     assert 'id="id_fbool" disabled>No</div>' in html  # readonly bool
     assert '>dumdum<' in html  # multiple widget
+
+
+def test_native_renderers(form):
+    from django.forms import fields, widgets, Select
+
+    from siteforms.renderers import render_native
+
+    class MyText(widgets.TextInput):
+        """"""
+
+    form_cls = form(
+        ftext=fields.CharField(initial='<"a&b">'),
+        fnum=fields.IntegerField(initial=10, widget=widgets.NumberInput(attrs={'data-x': True, 'data-y': False})),
+        fhidden=fields.CharField(widget=widgets.HiddenInput, required=False),
+        fpass=fields.CharField(widget=widgets.PasswordInput),
+        fpassshown=fields.CharField(widget=widgets.PasswordInput(render_value=True)),
+        farea=fields.CharField(widget=widgets.Textarea, initial='one\ntwo<'),
+        fareaempty=fields.CharField(widget=widgets.Textarea, disabled=True),
+        fcheck=fields.BooleanField(initial=True),
+        fcheckoff=fields.BooleanField(required=False),
+        fselect=fields.ChoiceField(choices=[
+            ('', '---'), ('a', 'A<'), ('group<', [('b', 'B'), ('c', 'C')]), (3, 3000),
+        ], initial='c'),
+        fselectmulti=fields.MultipleChoiceField(choices=[(1, 'one'), (2, 'two'), (3, 'three')], initial=[1, 3]),
+        fcustom=fields.CharField(widget=MyText),
+    )
+
+    frm = form_cls()
+
+    for field in frm:
+        expected = field.as_widget(attrs={'class': 'some'})
+        rendered = render_native(field, {'class': 'some'})
+
+        if isinstance(field.field.widget, MyText):
+            assert rendered is None
+
+        else:
+            assert rendered == expected, field.name
+
+    # Custom templates are respected.
+    widget = frm['fselect'].field.widget
+    widget.option_template_name = 'my.html'
+    assert render_native(frm['fselect']) is None
+    widget.option_template_name = Select.option_template_name
+
+    # Bound data.
+    frm = form_cls({
+        'fselect': 'a', 'fselectmulti': ['2'], 'ftext': '&', 'fcheck': 'on',
+        'fpass': 'secret', 'fpassshown': 'shown',
+    })
+    for field in frm:
+        if not isinstance(field.field.widget, MyText):
+            assert render_native(field) == field.as_widget(), field.name
+
+    # Passwords are not rendered back unless asked to.
+    assert 'secret' not in render_native(frm['fpass'])
+    assert 'value="shown"' in render_native(frm['fpassshown'])
+
+
+def test_native_options_cache(form):
+    from django.forms import fields
+    from django.utils.translation import override
+
+    from siteforms.renderers import render_native, compile_options
+
+    choices = [(idx, f'opt<{idx}>') for idx in range(20)] + [('dup', 'one'), ('dup', 'two')]
+
+    form_cls = form(
+        fsingle=fields.ChoiceField(choices=choices),
+        fmulti=fields.MultipleChoiceField(choices=choices),
+        fodd=fields.ChoiceField(choices=[({'un': 'hashable'}, 'odd'), ('', 'empty')]),
+    )
+
+    compile_options.cache_clear()
+
+    for data in (
+        {},
+        {'fsingle': '5', 'fmulti': ['1', '7']},
+        {'fsingle': 'dup', 'fmulti': ['dup', '3']},
+        {'fsingle': '50', 'fmulti': ['50']},
+    ):
+        frm = form_cls(data or None)
+
+        for field in frm:
+            assert render_native(field) == field.as_widget(), field.name
+
+    # Options are compiled only once.
+    assert compile_options.cache_info().misses == 1
+
+    with override('de'):
+        render_native(form_cls()['fsingle'])
+
+    assert compile_options.cache_info().misses == 2
+
+
+def test_readonly_fast(form):
+    from datetime import date
+
+    from siteforms.composers.bootstrap5 import Bootstrap5
+    from siteforms.tests.testapp.models import Additional
+
+    thing = Thing.objects.create(
+        fchar='<one>', fchoices='two', fbool=True, ftext='some\ntext',
+        fdate=date(2022, 1, 31), fforeign=Another.objects.create(fsome='fk'),
+    )
+    thing.fm2m.add(Additional.objects.create(fnum='m2m'))
+
+    class MyFcharWidget(ReadOnlyWidget):
+
+        def format_value_hook(self, value: Any):
+            return f'{value}xxx'
+
+    for composer in (None, Bootstrap5):
+        for kwargs in ({'instance': thing}, {'instance': Thing(fchoices='unknown')}):
+
+            def render(fast):
+                form_cls = form(
+                    model=Thing, composer=composer, options={'opt_readonly_fast': fast},
+                    model_meta={'widgets_readonly': {'fchar': MyFcharWidget}},
+                )
+                return f"{form_cls(readonly_fields='__all__', **kwargs)}"
+
+            html = render(True)
+            assert html == render(False)
+
+    assert 'xxx' in html
+    assert '&lt;unknown (unknown)&gt;' in html
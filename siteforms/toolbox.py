@@ -1,5 +1,10 @@
-from django.forms import ModelForm as _ModelForm, Form as _Form
+from typing import Generator as _Generator
+
+from django.db.models import QuerySet as _QuerySet, Model as _Model
+from django.forms import ModelForm as _ModelForm, Form as _Form, ModelChoiceField as _ModelChoiceField
 from django.forms import fields  # noqa exposed for convenience
+from django.forms.models import model_to_dict as _model_to_dict
+from django.core.exceptions import FieldDoesNotExist as _FieldDoesNotExist
 
 from .base import SiteformsMixin as _Mixin, FilteringSiteformsMixin as _FilteringMixin
 from .metas import BaseMeta as _BaseMeta, ModelBaseMeta as _ModelBaseMeta
@@ -27,6 +32,92 @@ class _ModelFormBase(_ModelForm):
 
         return super().save(commit)
 
+    @classmethod
+    def render_rows(cls, queryset: _QuerySet, **kwargs) -> _Generator[str, None, None]:
+        """Renders the given model instances using this form in read-only mode,
+        yielding HTML for every instance. Useful for listings.
+
+        A single form object is initialized and reused for all the instances.
+        Relations shown by read-only fields (FK, M2M) are fetched for the whole
+        queryset beforehand (select_related, prefetch_related).
+
+        Example::
+
+            rows = MyForm.render_rows(MyModel.objects.all()[:200])
+
+        :param queryset:
+        :param kwargs: Form arguments. Defaults: readonly_fields='__all__', render_form_tag=False.
+
+        """
+        kwargs = {'readonly_fields': '__all__', 'render_form_tag': False, **kwargs}
+        initial = kwargs.pop('initial', None) or {}
+
+        form = None
+
+        for instance in cls._rows_prefetch(queryset, readonly=kwargs['readonly_fields']):
+
+            if form is None:
+                form = cls(instance=instance, initial=initial, **kwargs)
+
+            else:
+                form._rows_set_instance(instance, initial=initial)
+
+            yield form.render()
+
+    @classmethod
+    def _rows_prefetch(cls, queryset: _QuerySet, *, readonly) -> _QuerySet:
+        model = queryset.model
+        subforms = cls.subforms or {}
+
+        select = []
+        prefetch = []
+
+        for name, field in cls.base_fields.items():
+
+            if name in subforms or not isinstance(field, _ModelChoiceField):
+                # Subforms fetch data by themselves.
+                continue
+
+            if readonly != '__all__' and name not in readonly:
+                continue
+
+            try:
+                model_field = model._meta.get_field(name)
+
+            except _FieldDoesNotExist:
+                continue
+
+            if model_field.many_to_many:
+                prefetch.append(name)
+
+            elif model_field.many_to_one or model_field.one_to_one:
+                select.append(name)
+
+        if select:
+            queryset = queryset.select_related(*select)
+
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        return queryset
+
+    def _rows_set_instance(self, instance: _Model, *, initial: dict):
+        # Rebinds this (unbound) form to another instance. Mimics ModelForm initialization.
+        opts = self._meta
+
+        object_data = _model_to_dict(instance, opts.fields, opts.exclude)
+
+        for property_field in self._get_meta_option('property_fields', []):
+            object_data[property_field] = getattr(instance, property_field)
+
+        object_data.update(initial)
+
+        self.instance = instance
+        self.initial = object_data
+
+        self._bound_fields_cache.clear()
+        self._subforms.clear()
+
 
 class ModelForm(_Mixin, _ModelFormBase, metaclass=_ModelBaseMeta):
     """Base model form with siteforms features enabled."""
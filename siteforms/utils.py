@@ -1,7 +1,9 @@
-from contextlib import contextmanager
-from typing import Optional, Union
+from typing import Optional, Union, Callable, Awaitable, List
 
-from django.forms import Field
+from django import VERSION as DJANGO_VERSION
+from django.core.exceptions import ObjectDoesNotExist, FieldDoesNotExist
+from django.db.models import Model, ForeignKey, ManyToManyField
+from django.forms import Field, ModelChoiceField
 
 if False:  # pragma: nocover
     from .base import TypeSubform  # noqa
@@ -42,26 +44,134 @@ def bind_subform(*, subform: 'TypeSubform', field: Field):
     field.form = subform
 
 
-@contextmanager
-def temporary_fields_patch(form):
-    """Too bad. Since Django's BoundField uses form base fields attributes,
-    (but not its own, e.g. for disabled in .build_widget_attrs())
-    we are forced to store and restore previous values not to have side
-    effects on form classes reuse.
+def check_async_support():
+    """Raises ValueError if Django in use doesn't support async rendering.
+    Async ORM (QuerySet.aget(), acount(), async iteration) requires Django 4.1+.
 
-    .. warning:: Possible race condition. Maybe fix that someday?
+    """
+    if DJANGO_VERSION < (4, 1):
+        raise ValueError('Async rendering requires Django 4.1 or newer.')
 
-    :param form:
 
-    """
-    originals = {}
+async def aprefetch_related(instance: Optional[Model], name: str):
+    """Loads related object (FK, one-to-one) or related objects (M2M)
+    for the given instance field into instance caches using async ORM,
+    so that a subsequent attribute access doesn't query database.
+
+    :param instance:
+    :param name: Model field name.
 
-    for name, field in form.base_fields.items():
-        originals[name] = (field.widget, field.disabled)
+    """
+    if instance is None:
+        return
 
     try:
-        yield
+        model_field = instance._meta.get_field(name)
+
+    except FieldDoesNotExist:
+        return
+
+    if isinstance(model_field, ManyToManyField):
+
+        if instance.pk is None:
+            return
+
+        manager = getattr(instance, name)
+        cache_name = manager.prefetch_cache_name
+
+        if not hasattr(instance, '_prefetched_objects_cache'):
+            instance._prefetched_objects_cache = {}
+
+        prefetched = instance._prefetched_objects_cache
+
+        if cache_name not in prefetched:
+            queryset = manager.all()
+
+            async for _ in queryset:  # Populates queryset cache.
+                break
+
+            prefetched[cache_name] = queryset
+
+    elif isinstance(model_field, ForeignKey):
+
+        if model_field.is_cached(instance) or None in model_field.get_local_related_value(instance):
+            return
+
+        # Mimics ForwardManyToOneDescriptor.get_object().
+        queryset = getattr(instance.__class__, name).get_queryset(instance=instance)
+
+        try:
+            related = await queryset.aget(model_field.get_reverse_related_filter(instance))
+
+        except ObjectDoesNotExist:
+            # Leave it to a sync access to raise.
+            return
+
+        model_field.set_cached_value(instance, related)
+
+
+class ChoicesLeadingMixin:
+    """Mixin for ModelChoiceIterator to yield the given choices
+    before those from a queryset.
+
+    """
+    choices_leading: tuple = ()
+
+    def __iter__(self):
+        yield from self.choices_leading
+        yield from super().__iter__()
+
+    def __len__(self):
+        return len(self.choices_leading) + super().__len__()
+
+    def __bool__(self):
+        return bool(self.choices_leading) or super().__bool__()
+
+
+async def afetch_choices(field: ModelChoiceField) -> List[tuple]:
+    """Returns choices for the given field fetched using async ORM.
+    Mimics ModelChoiceIterator.
+
+    :param field:
+
+    """
+    iterator = field.iterator(field)
+    choices = [iterator.choice(obj) async for obj in field.queryset.all()]
+
+    if field.empty_label is not None:
+        choices.insert(0, ('', field.empty_label))
 
-    finally:
-        for name, field in form.base_fields.items():
-            field.widget, field.disabled = originals[name]
+    # See ChoicesLeadingMixin.
+    choices[:0] = getattr(iterator, 'choices_leading', ())
+
+    return choices
+
+
+async def render_async(*, prefetch: Callable[[], Awaitable], render: Callable[[], str]) -> str:
+    """Renders using the given function without blocking an event loop:
+    data required for rendering is prefetched using async ORM beforehand.
+
+    If rendering still requires database access (e.g. custom widgets
+    querying database on their own), SynchronousOnlyOperation is raised.
+    Rendering is not retried in a thread, since the first attempt
+    might have already changed the state of forms and widgets.
+
+    :param prefetch: Coroutine function to prefetch data.
+    :param render: Render function.
+
+    """
+    check_async_support()
+
+    from django.core.exceptions import SynchronousOnlyOperation
+
+    await prefetch()
+
+    try:
+        return render()
+
+    except SynchronousOnlyOperation as e:
+        raise SynchronousOnlyOperation(
+            'Rendering requires database access not covered by prefetching '
+            '(e.g. custom widgets querying database). '
+            'Render in a thread instead: `await sync_to_async(form.render)()`.'
+        ) from e